@@ -1,10 +1,21 @@
 import os
-import re
+import time
 import streamlit as st
-import tempfile
-from transformers import pipeline
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+
+from utils.audio import TARGET_SR, load_audio
+from utils.cache import ResultCache, hash_file, make_key
+from utils.config import FAST_CPU, LIBRARY, METRICS, METRICS_RUNS, PIPELINE, QG_MAX_QUESTIONS, VAD
+from utils.export import format_questions, format_summary, render_notes_pdf
+from utils.jobs import ACTIVE, JobQueue
+from utils.journal import TranscriptJournal
+from utils.library import LectureLibrary
+from utils.metrics import recent_runs, run, stage
+from utils.models import load_pipeline, load_whisper, stream_transcribe
+from utils.registry import ModelPool, private_tokenizer
+from utils.pipeline import run_pipelined
+from utils.questions import generate_question_list
+from utils.summarize import summarize_long
+from utils.text import clean_text
 
 # -------------------- PAGE CONFIG ----------------------------
 st.set_page_config(
@@ -124,81 +135,79 @@ h2, h3, label, p {
 
 
 # ---------- LOAD MODELS ----------
-@st.cache_resource
-def load_models():
-    asr = pipeline(
-        "automatic-speech-recognition",
-        model="openai/whisper-base",
-        chunk_length_s=30,
-        return_timestamps=False
-    )
+ASR_MODEL = "openai/whisper-base"
+SUMMARY_MODEL = "facebook/bart-large-cnn"
+QG_MODEL = "valhalla/t5-small-qg-hl"
 
-    summarizer = pipeline(
-        "summarization", model="facebook/bart-large-cnn"
-    )
-
-    qg = pipeline(
-        "text2text-generation",
-        model="valhalla/t5-small-qg-hl"
-    )
+ASR_PARAMS = {"window_s": 30.0, "overlap_s": 5.0, "vad": VAD}
+SUMMARY_PARAMS = {"max_length": 200, "min_length": 70, "do_sample": False}
+# characters of the running transcript shown while a job transcribes
+PARTIAL_CHARS = 500
 
-    return asr, summarizer, qg
 
+@st.cache_resource
+def load_model_pool():
+    # Nothing is loaded here: each model loads when its stage first runs,
+    # so the page renders before transformers/torch are even imported.
+    # With LETUNOTE_DAEMON set the loaders return stand-ins and the weights
+    # live once per host in the shared inference daemon (utils/daemon.py)
+    pool = ModelPool()
+    pool.register("asr", lambda: load_whisper(ASR_MODEL, FAST_CPU))
+    pool.register(
+        "summarizer", lambda: load_pipeline("summarization", SUMMARY_MODEL, FAST_CPU)
+    )
+    pool.register(
+        "qg", lambda: load_pipeline("text2text-generation", QG_MODEL, FAST_CPU)
+    )
+    return pool
 
-asr_pipe, summarizer_pipe, qg_pipe = load_models()
-
-# ------------------ CLEAN TEXT -------------------------------
-def clean_text(text):
-    text = re.sub(r"\s+", " ", text).strip()
-    text = re.sub(r"[^\x00-\x7F]+", " ", text)
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    cleaned = []
-    seen = set()
 
-    for s in sentences:
-        s_strip = s.strip()
-        if len(s_strip) < 5:
-            continue
-        s_key = s_strip.lower()
-        if s_key in seen:
-            continue
+@st.cache_resource
+def load_cache():
+    return ResultCache()
 
-        seen.add(s_key)
-        cleaned.append(s_strip)
 
-    text = " ".join(cleaned)
+@st.cache_resource
+def load_library():
+    return LectureLibrary()
 
-    text = re.sub(
-        r'\b((?:\w+\s+){5,15}\w+)(?:\s+\1)+',
-        r'\1', text, flags=re.IGNORECASE
-    )
-    text = re.sub(
-        r'\b((?:\w+\s+){3,8}\w+)(?:\s+\1)+',
-        r'\1', text, flags=re.IGNORECASE
-    )
-    text = re.sub(
-        r'\b((?:\w+\s+){1,3}\w+)(?:\s+\1)+',
-        r'\1', text, flags=re.IGNORECASE
-    )
-    text = re.sub(
-        r'\b(\w+)( \1\b)+', r'\1', text, flags=re.IGNORECASE
-    )
 
-    return text.strip()
+models = load_model_pool()
+cache = load_cache()
+# one library for the whole server, so only opened when enabled
+library = load_library() if LIBRARY else None
 
 # ---------------------- TRANSCRIBE AUDIO ---------------------
-def process_audio(audio):
-    ext = audio.name.split(".")[-1]
-    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{ext}") as tmp:
-        tmp.write(audio.read())
-        path = tmp.name
-
-    with st.spinner("Transcribing with Whisper Base..."):
-        result = asr_pipe(path)
-
-    os.remove(path)
-
-    text = clean_text(result.get("text", "").strip())
+def transcribe_pieces(audio, progress, journal, segments):
+    """
+    Raw Whisper text, piece by piece, reporting progress as it goes.
+    The upload is decoded straight from memory, and each decoded window
+    is checkpointed in `journal` so a retry resumes where this run stopped.
+    Timestamped pieces are collected in `segments` for the lecture library.
+    """
+    with stage("decode audio", audio_s=lambda: samples.size / TARGET_SR):
+        samples = load_audio(audio)
+    duration = max(samples.size / TARGET_SR, 1e-6)
+    tail = ""
+
+    with models.use("asr") as (processor, asr_model), stage("whisper", audio_s=duration):
+        for piece in stream_transcribe(
+            samples, processor=processor, asr_model=asr_model,
+            journal=journal, **ASR_PARAMS
+        ):
+            segments.append(piece)
+            # only the latest text is stored, so each update stays the same size
+            tail = f"{tail} {piece.text}".strip()
+            if len(tail) > PARTIAL_CHARS:
+                tail = "…" + tail[-PARTIAL_CHARS:]
+            progress("transcribing", min(piece.end / duration, 1.0), tail)
+            yield piece.text
+
+
+def process_audio(audio, progress, journal, segments):
+    raw = " ".join(transcribe_pieces(audio, progress, journal, segments)).strip()
+    with stage("clean_text", words=lambda: len(raw.split())):
+        text = clean_text(raw)
     if not text:
         raise RuntimeError("Whisper returned empty transcript.")
 
@@ -206,62 +215,104 @@ def process_audio(audio):
 
 # ------------------------ SUMMARY ----------------------------
 def generate_summary(text):
-    text = text[:1024]
-    with st.spinner("Generating Summary..."):
-        summ = summarizer_pipe(
-            text,
-            max_length=200,
-            min_length=70,
-            do_sample=False
-        )[0]["summary_text"]
-
-    bullet_summary = "### Summary\n"
-    for line in summ.split(". "):
-        if line.strip():
-            bullet_summary += f"- {line.strip()}\n"
-    return bullet_summary
+    with models.use("summarizer") as summarizer, stage(
+        "summarize",
+        tokens=lambda: len(private_tokenizer(summarizer.tokenizer)(text, verbose=False).input_ids)
+    ):
+        summ = summarize_long(text, summarizer, **SUMMARY_PARAMS)
+
+    return format_summary(summ)
 
 # -------------------- QUESTIONS ------------------------------
-def generate_questions(text):
-    cut = text[:700]
-    highlight = f"highlight: {cut}"
-
-    with st.spinner("❓ Generating Questions..."):
-        raw = qg_pipe(highlight)[0]["generated_text"]
-
-    qs = "### ❓ Questions\n"
-    for q in raw.split("?"):
-        if q.strip():
-            qs += f"- {q.strip()}?\n"
-    return qs
-
-# ---------------------- PDF CREATION -------------------------
-def create_pdf(transcript, summary, questions):
-    filename = "LetUNote_Notes.pdf"
-    c = canvas.Canvas(filename, pagesize=letter)
-    y = 750
-
-    def block(title, body):
-        nonlocal y
-        c.setFont("Times-Bold", 14)
-        c.drawString(40, y, title)
-        y -= 20
-        c.setFont("Times-Roman", 10)
-
-        for line in body.split("\n"):
-            if y < 40:
-                c.showPage()
-                y = 750
-            c.drawString(40, y, line[:100])
-            y -= 12
-        y -= 15
-
-    block("SUMMARY", summary)
-    block("QUESTIONS", questions)
-    block("TRANSCRIPT", transcript)
-
-    c.save()
-    return filename
+def generate_questions(text, max_questions=QG_MAX_QUESTIONS):
+    with models.use("qg") as qg, stage("questions", words=lambda: len(text.split())):
+        questions = generate_question_list(text, qg, max_questions=max_questions)
+
+    return format_questions(questions)
+
+# ------------------------ NOTES JOB --------------------------
+def generate_notes_pipelined(audio, max_questions, progress, journal, segments):
+    """
+    Summarize and generate questions chunk by chunk while Whisper is
+    still transcribing, instead of running the stages one after another.
+    """
+    with models.use("summarizer") as summarizer, models.use("qg") as qg:
+        transcript, summ, questions = run_pipelined(
+            transcribe_pieces(audio, progress, journal, segments),
+            summarizer,
+            qg,
+            SUMMARY_PARAMS,
+            max_questions=max_questions
+        )
+
+    if not transcript:
+        raise RuntimeError("Whisper returned empty transcript.")
+
+    return transcript, format_summary(summ), format_questions(questions)
+
+
+def add_to_library(key, name, segments, audio):
+    """
+    Index a freshly transcribed lecture for search. Transcripts served
+    from the cache bring no segments and were indexed when first made.
+    """
+    if LIBRARY and segments:
+        pieces = [p._replace(text=clean_text(p.text)) for p in segments]
+        library.add(key, name, [p for p in pieces if p.text], segments[-1].end, audio)
+
+
+def run_notes(audio, options, progress):
+    """
+    Full pipeline for one upload; runs on a background worker thread.
+    Repeat uploads of the same lecture are served from the on-disk cache.
+    """
+    # every stage timed below is grouped under this run in the metrics
+    with run(options.get("name", "")), stage("total"):
+        max_questions = options["max_questions"]
+        precision = "int8" if FAST_CPU else "fp32"
+        audio_key = make_key(hash_file(audio), ASR_MODEL, precision, **ASR_PARAMS)
+        summary_key = make_key(
+            audio_key, SUMMARY_MODEL, "map-reduce", **SUMMARY_PARAMS
+        )
+        questions_key = make_key(audio_key, QG_MODEL, "hl-batched", max_questions)
+        journal = TranscriptJournal.for_key(audio_key)
+        segments = []
+
+        if PIPELINE and cache.get("transcript", audio_key) is None:
+            transcript, summary, questions = generate_notes_pipelined(
+                audio, max_questions, progress, journal, segments
+            )
+            cache.put("transcript", audio_key, transcript)
+            journal.complete()
+            cache.put("summary", summary_key, summary)
+            cache.put("questions", questions_key, questions)
+            add_to_library(audio_key, options.get("name", ""), segments, audio)
+            return {"transcript": transcript, "summary": summary, "questions": questions}
+
+        transcript = cache.fetch(
+            "transcript", audio_key, lambda: process_audio(audio, progress, journal, segments)
+        )
+        journal.complete()
+        add_to_library(audio_key, options.get("name", ""), segments, audio)
+        progress("summarizing", 0.0)
+        summary = cache.fetch(
+            "summary", summary_key, lambda: generate_summary(transcript)
+        )
+        progress("generating questions", 0.0)
+        questions = cache.fetch(
+            "questions", questions_key,
+            lambda: generate_questions(transcript, max_questions)
+        )
+
+        return {"transcript": transcript, "summary": summary, "questions": questions}
+
+
+@st.cache_resource
+def load_jobs():
+    return JobQueue(run_notes)
+
+
+jobs = load_jobs()
 
 # --------------------- SESSION STATE -------------------------
 for k in ["transcript", "summary", "questions"]:
@@ -289,17 +340,41 @@ with col1:
             "Upload WAV/MP3",
             type=["wav", "mp3"]
         )
-        run = st.form_submit_button("Generate Notes")
+        max_questions = st.slider(
+            "Number of questions", 1, 30, QG_MAX_QUESTIONS
+        )
+        submitted = st.form_submit_button("Generate Notes")
 
-    if run:
+    if submitted:
         if not file:
             st.error("Please upload a file.")
             st.stop()
 
-        st.session_state.transcript = process_audio(file)
-        st.session_state.summary = generate_summary(st.session_state.transcript)
-        st.session_state.questions = generate_questions(st.session_state.transcript)
+        job_id = jobs.submit(file, {"name": file.name, "max_questions": max_questions})
+        st.session_state.job_id = job_id
+        st.query_params["job"] = job_id
+
+    # Reattach to a running job after a refresh via ?job=<id>
+    job_id = st.session_state.get("job_id") or st.query_params.get("job")
+    job = jobs.get(job_id) if job_id else None
+    poll = False
+
+    if job and job["status"] in ACTIVE:
+        st.caption(f"Job `{job_id}` · {job['options'].get('name', '')}")
+        st.progress(job["progress"] or 0.0, text=(job["stage"] or "queued").capitalize() + "...")
+        if job["partial"]:
+            st.caption(job["partial"])
+        if st.button("Cancel"):
+            jobs.cancel(job_id)
+        poll = True
+    elif job and job["status"] == "done" and st.session_state.get("loaded_job") != job_id:
+        st.session_state.update(job["result"])
+        st.session_state.loaded_job = job_id
         st.success("Notes generated successfully!")
+    elif job and job["status"] == "failed":
+        st.error(f"Note generation failed: {job['error']}")
+    elif job and job["status"] == "cancelled":
+        st.warning("Note generation was cancelled.")
 
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -321,21 +396,77 @@ with col2:
             st.markdown(st.session_state.questions)
 
         # PDF download
-        pdf_file = create_pdf(
+        pdf_bytes = render_notes_pdf(
             st.session_state.transcript,
             st.session_state.summary,
             st.session_state.questions
         )
 
-        with open(pdf_file, "rb") as f:
-            st.download_button(
-                "Download PDF",
-                f,
-                file_name="LetUNote_Content.pdf"
-            )
+        st.download_button(
+            "Download PDF",
+            pdf_bytes,
+            file_name="LetUNote_Content.pdf",
+            mime="application/pdf"
+        )
         st.markdown('</div>', unsafe_allow_html=True)
 
+# --------------------- LECTURE SEARCH ------------------------
+if LIBRARY:
+    st.markdown("### 🔎 Search my lectures")
+    shelf = library.stats()
+    query = st.text_input(
+        "Search",
+        placeholder='gradient descent · "chain rule" · deriv*',
+        help='Quote a phrase for an exact match; end a word with * to match a prefix.',
+        label_visibility="collapsed",
+    )
+    st.caption(f"{shelf['lectures']} lectures · {shelf['hours']:.1f} hours indexed")
+
+    if query:
+        hits = library.search(query, limit=20)
+        if not hits:
+            st.info("No matches.")
+        for i, hit in enumerate(hits):
+            minutes, seconds = divmod(int(hit["start"]), 60)
+            left, right = st.columns([5, 1])
+            left.markdown(f"**{hit['name']}** · `{minutes:02d}:{seconds:02d}`  \n{hit['text']}")
+            if hit["audio"] and os.path.exists(hit["audio"]) and right.button("▶ Play", key=f"play-{i}"):
+                st.session_state.play = (hit["audio"], int(hit["start"]))
+
+        play = st.session_state.get("play")
+        if play:
+            st.audio(play[0], start_time=play[1])
+
+# ------------------------ METRICS ----------------------------
+if METRICS:
+    with st.sidebar:
+        st.markdown("### ⏱️ Recent runs")
+        for run_id, label, entries in recent_runs(METRICS_RUNS):
+            st.caption(f"{label or run_id} · {time.strftime('%d-%m %H:%M', time.localtime(entries[0]['time']))}")
+            st.dataframe(
+                [
+                    {
+                        "stage": e["stage"],
+                        "wall s": e["wall_s"],
+                        "CPU s": e["cpu_s"],
+                        "peak RSS +MB": e["peak_rss_mb"],
+                        "input": ", ".join(
+                            f"{k} {e[k]:g}" for k in ("audio_s", "tokens", "words", "chunks")
+                            if e.get(k) is not None
+                        ),
+                        "RTF": e.get("rtf"),
+                    }
+                    for e in entries
+                ],
+                hide_index=True,
+            )
+
 # FOOTER
 st.markdown("""<br><center style="color:#37627B; font-weight:600;">
 © 2026 Sanjana Krishnan • LetUNote AI</center>
 """, unsafe_allow_html=True)
+
+# Keep polling the background job until it finishes
+if poll:
+    time.sleep(1)
+    st.rerun()
@@ -0,0 +1,63 @@
+# benchmarks/bench_batch.py
+"""
+Whisper batch-size sweep: audio seconds decoded per wall-clock second.
+
+    python benchmarks/bench_batch.py "Lecture audio.mp3"
+    python benchmarks/bench_batch.py lecture.wav --asr openai/whisper-small --sizes 1,2,4,8 --no-vad
+
+Use the best size as LETUNOTE_ASR_BATCH_SIZE on this machine, or set
+LETUNOTE_ASR_BATCH_MB so the automatic size (shown as "auto") lands on it.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from utils.audio import TARGET_SR, load_audio  # noqa: E402
+from utils.batching import BatchDecoder, per_item_mb  # noqa: E402
+from utils.models import load_whisper, stream_transcribe  # noqa: E402
+from utils.quantize import configure_threads  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("audio")
+    parser.add_argument("--asr", default="openai/whisper-base")
+    parser.add_argument("--sizes", default="1,2,4,8,16", help="comma-separated batch sizes")
+    parser.add_argument("--no-vad", action="store_true", help="fixed 30 s windows instead of VAD segments")
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    configure_threads(args.threads, 0)
+    samples = load_audio(args.audio)
+    processor, asr_model = load_whisper(args.asr)
+    print(f"audio: {args.audio} ({samples.size / TARGET_SR:.0f} s), model: {args.asr}")
+    print(f"estimated memory per batch item: {per_item_mb(asr_model.config):.0f} MB")
+
+    # warm-up
+    BatchDecoder(processor, asr_model, batch_size=1).decode([np.zeros(TARGET_SR, dtype=np.float32)])
+
+    auto = BatchDecoder(processor, asr_model)
+    runs = [(str(size), int(size)) for size in args.sizes.split(",")]
+    runs.append((f"auto={auto.batch_size}", auto.batch_size))
+
+    reference = None
+    print(f"{'batch':>8} {'batches':>8} {'wall s':>8} {'audio s/s':>10}  same text")
+    for label, size in runs:
+        decoder = BatchDecoder(processor, asr_model, batch_size=size)
+        text = " ".join(
+            piece.text for piece in stream_transcribe(
+                samples, processor=processor, asr_model=asr_model,
+                vad=not args.no_vad, decoder=decoder,
+            )
+        )
+        reference = text if reference is None else reference
+        print(f"{label:>8} {decoder.stats['batches']:>8} {decoder.stats['wall_s']:>8.2f} "
+              f"{decoder.throughput:>10.1f}  {text == reference}")
+
+
+if __name__ == "__main__":
+    main()
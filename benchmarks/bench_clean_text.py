@@ -0,0 +1,113 @@
+# benchmarks/bench_clean_text.py
+"""
+Micro-benchmark: clean_text against the regex cascade it replaced.
+
+    python benchmarks/bench_clean_text.py --sizes 1000 4000 16000 64000
+
+Transcripts are synthetic Whisper-like text with stuttered words,
+repeated phrases and hallucinated loops ("mixed"), plus a phrase looping
+with one word changed per copy ("near-repeat"). The legacy implementation is
+only timed up to --legacy-max words because it backtracks badly.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.text import clean_text  # noqa: E402
+
+VOCAB = (
+    "the gradient of the loss function tells us which direction to move "
+    "so we take each small step with fixed learning rate and repeat until "
+    "our model converges over training data and afterwards we check validation"
+).split()
+
+
+def legacy_clean_text(text):
+    text = re.sub(r"\s+", " ", text).strip()
+    text = re.sub(r"[^\x00-\x7F]+", " ", text)
+    sentences = re.split(r'(?<=[.!?])\s+', text)
+    cleaned = []
+    seen = set()
+    for s in sentences:
+        s_strip = s.strip()
+        if len(s_strip) < 5:
+            continue
+        s_key = s_strip.lower()
+        if s_key in seen:
+            continue
+        seen.add(s_key)
+        cleaned.append(s_strip)
+    text = " ".join(cleaned)
+    text = re.sub(r'\b((?:\w+\s+){5,15}\w+)(?:\s+\1)+', r'\1', text, flags=re.IGNORECASE)
+    text = re.sub(r'\b((?:\w+\s+){3,8}\w+)(?:\s+\1)+', r'\1', text, flags=re.IGNORECASE)
+    text = re.sub(r'\b((?:\w+\s+){1,3}\w+)(?:\s+\1)+', r'\1', text, flags=re.IGNORECASE)
+    text = re.sub(r'\b(\w+)( \1\b)+', r'\1', text, flags=re.IGNORECASE)
+    return text.strip()
+
+
+def synthetic_transcript(n_words, seed=0):
+    rnd = random.Random(seed)
+    words = []
+    while len(words) < n_words:
+        r = rnd.random()
+        if r < 0.05 and words:
+            # hallucinated loop: a phrase repeated several times
+            k = rnd.randint(1, min(16, len(words)))
+            words.extend(words[-k:] * rnd.randint(1, 4))
+        elif r < 0.15:
+            words.append(rnd.choice(VOCAB) + ".")
+        else:
+            words.append(rnd.choice(VOCAB))
+    return " ".join(words[:n_words])
+
+
+def near_repeat_transcript(n_words, seed=0):
+    # A 16-word phrase looping with one word changed per copy: every
+    # position almost repeats, which is the regex cascade's worst case.
+    rnd = random.Random(seed)
+    words = []
+    while len(words) < n_words:
+        phrase = VOCAB[:16]
+        phrase[rnd.randrange(16)] = rnd.choice(VOCAB)
+        words.extend(phrase)
+    return " ".join(words[:n_words])
+
+
+PROFILES = {"mixed": synthetic_transcript, "near-repeat": near_repeat_transcript}
+
+
+def timed(fn, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000, 16000, 64000])
+    parser.add_argument("--legacy-max", type=int, default=16000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'profile':>12} {'words':>8} {'clean_text s':>13} {'us/word':>8} {'legacy s':>10} {'same':>5}")
+    for profile, make in PROFILES.items():
+        for n in args.sizes:
+            text = make(n)
+            new = timed(clean_text, text, args.repeat)
+            legacy, same = "-", "-"
+            if n <= args.legacy_max:
+                legacy = f"{timed(legacy_clean_text, text, 1):.4f}"
+                same = "yes" if clean_text(text) == legacy_clean_text(text) else "no"
+            print(f"{profile:>12} {n:>8} {new:>13.4f} {new / n * 1e6:>8.2f} {legacy:>10} {same:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# benchmarks/bench_daemon.py
+"""
+Inference daemon under concurrent load: throughput and batch occupancy.
+
+    python benchmarks/bench_daemon.py
+    python benchmarks/bench_daemon.py --clients 1,4,16 --stage summarize \
+        --summarizer sshleifer/distilbart-cnn-12-6
+
+Each client thread stands for one session and sends `--calls` single-input
+requests (one 30 s audio window, one transcript chunk or one highlighted
+prompt) to a daemon started in this process. Every client count runs twice:
+with --max-batch 1 (one request per forward pass, like a private model
+copy serving sessions in turn) and with the daemon's batching. Models
+default to the tiny stand-ins from benchmarks/tiny_models.py.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import lecture_audio, transcript  # noqa: E402
+from tiny_models import build_tiny_models  # noqa: E402
+from utils.audio import TARGET_SR  # noqa: E402
+from utils.batching import BatchDecoder  # noqa: E402
+from utils.config import DAEMON_MAX_BATCH, DAEMON_WINDOW_MS  # noqa: E402
+from utils.daemon import DaemonClient, InferenceServer  # noqa: E402
+from utils.models import load_pipeline, load_whisper  # noqa: E402
+from utils.questions import build_inputs  # noqa: E402
+
+
+def workload(stage, args, address):
+    """
+    A function running one single-input request through the daemon.
+    """
+    if stage == "asr":
+        processor, model = load_whisper(args.asr, False, daemon=address)
+        decoder = BatchDecoder(processor, model, batch_size=1)
+        window = lecture_audio(30)[:30 * TARGET_SR]
+        return lambda: decoder.decode([window])
+
+    if stage == "summarize":
+        summarizer = load_pipeline("summarization", args.summarizer, False, daemon=address)
+        chunk = transcript(300)
+        return lambda: summarizer(chunk, truncation=True, max_length=60, min_length=10, do_sample=False)
+
+    qg = load_pipeline("text2text-generation", args.qg, False, daemon=address)
+    prompt = build_inputs(transcript(120), 1)[0]
+    return lambda: qg(prompt, truncation=True, max_length=64)
+
+
+def run(stage, args, clients, max_batch):
+    address = os.path.join(tempfile.mkdtemp(prefix="letunote-daemon-"), "d.sock")
+    server = InferenceServer(address, window_ms=args.window_ms, max_batch=max_batch,
+                             max_queue=max(64, clients))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    while not os.path.exists(address):
+        time.sleep(0.01)
+
+    try:
+        call = workload(stage, args, address)
+        call()  # load the model in the daemon before timing
+
+        def client():
+            for _ in range(args.calls):
+                call()
+
+        before = server.stats()
+        threads = [threading.Thread(target=client) for _ in range(clients)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - start
+        after = DaemonClient(address).stats()
+    finally:
+        server.close()
+        thread.join()
+
+    batches = after["batches"] - before["batches"]
+    inputs = after["inputs"] - before["inputs"]
+    return clients * args.calls / wall, inputs / max(batches, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stage", choices=["asr", "summarize", "qg"], default="summarize")
+    parser.add_argument("--clients", default="1,4,16", help="comma-separated concurrent sessions")
+    parser.add_argument("--calls", type=int, default=8, help="requests per client")
+    parser.add_argument("--window-ms", type=float, default=DAEMON_WINDOW_MS)
+    parser.add_argument("--max-batch", type=int, default=DAEMON_MAX_BATCH)
+    parser.add_argument("--models", default=os.path.join(tempfile.gettempdir(), "letunote-tiny"),
+                        help="where the tiny models are built when no model ids are given")
+    parser.add_argument("--asr")
+    parser.add_argument("--summarizer")
+    parser.add_argument("--qg")
+    args = parser.parse_args()
+
+    tiny = build_tiny_models(args.models)
+    args.asr = args.asr or tiny["asr"]
+    args.summarizer = args.summarizer or tiny["summarizer"]
+    args.qg = args.qg or tiny["qg"]
+
+    print(f"stage: {args.stage}, {args.calls} calls per client, window {args.window_ms:g} ms")
+    print(f"{'clients':>8} {'serial req/s':>13} {'batched req/s':>14} {'occupancy':>10} {'speedup':>8}")
+    for clients in [int(c) for c in args.clients.split(",")]:
+        serial, _ = run(args.stage, args, clients, max_batch=1)
+        batched, occupancy = run(args.stage, args, clients, max_batch=args.max_batch)
+        print(f"{clients:>8} {serial:>13.2f} {batched:>14.2f} {occupancy:>10.2f} {batched / serial:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
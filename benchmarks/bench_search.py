@@ -0,0 +1,72 @@
+# benchmarks/bench_search.py
+"""
+Lecture library: indexing speed, database size and query latency.
+
+    python benchmarks/bench_search.py --hours 300
+    python benchmarks/bench_search.py --hours 1000 --db /tmp/library.sqlite3
+
+Builds a throwaway library of synthetic lectures: 150 words per minute,
+30 s segments, words drawn from a Zipf-distributed vocabulary as in real
+speech. It then times phrase, prefix and multi-word queries (best of
+--repeat runs).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from utils.library import LectureLibrary  # noqa: E402
+from utils.models import TranscriptPiece  # noqa: E402
+
+QUERIES = [
+    '"w0 w1"', '"w0 w1 w2"', '"w5 w17"', '"w40 w41 w42"',
+    "w200 w3000", "w1 w2 w3", "w12*", "w9000",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hours", type=int, default=100)
+    parser.add_argument("--vocab", type=int, default=30000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db", help="library file (default: a temporary one)")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    path = args.db or os.path.join(tmp.name, "library.sqlite3")
+    library = LectureLibrary(path, os.path.join(tmp.name, "audio"))
+
+    rng = np.random.default_rng(0)
+    vocab = np.array([f"w{i}" for i in range(args.vocab)])
+    p = 1 / np.arange(1, args.vocab + 1) ** 1.07
+    p /= p.sum()
+
+    start = time.perf_counter()
+    for hour in range(args.hours):
+        words = vocab[rng.choice(args.vocab, 9000, p=p)]
+        pieces = [
+            TranscriptPiece(i * 0.4, (i + 75) * 0.4, " ".join(words[i:i + 75]))
+            for i in range(0, words.size, 75)
+        ]
+        library.add(f"bench-{hour}", f"lecture-{hour}.mp3", pieces, 3600.0)
+    index_s = time.perf_counter() - start
+
+    print(f"indexed {args.hours} h in {index_s:.1f} s "
+          f"({index_s / args.hours * 1000:.0f} ms per hour), {os.path.getsize(path) / 1e6:.0f} MB")
+    print(f"{'query':<20} {'hits':>5} {'best ms':>8}")
+    for query in QUERIES:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            hits = library.search(query)
+            times.append(time.perf_counter() - start)
+        print(f"{query:<20} {len(hits):>5} {min(times) * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/bench_startup.py
+"""
+Startup time and peak RSS for each model-loading configuration.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget-mb 800
+
+Every configuration runs in a fresh interpreter so imports and memory
+are measured from zero:
+
+  eager       import transformers/torch and build all three pipelines,
+              as app.py did before models were loaded lazily
+  lazy        import the app's modules and register the model pool only
+              (what happens before the first upload)
+  lazy+asr    lazy, then load only the Whisper stage
+  lazy+all    lazy, then run through every stage in order
+  budgeted    lazy+all with LETUNOTE_MODEL_BUDGET_MB=--budget-mb
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, resource, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+config, asr, summ, qg = {config!r}, {asr!r}, {summ!r}, {qg!r}
+
+if config == "eager":
+    from transformers import pipeline
+    pipeline("automatic-speech-recognition", model=asr)
+    pipeline("summarization", model=summ)
+    pipeline("text2text-generation", model=qg)
+    stats = []
+else:
+    from utils.models import load_pipeline, load_whisper
+    from utils.registry import ModelPool
+    pool = ModelPool()
+    pool.register("asr", lambda: load_whisper(asr))
+    pool.register("summarizer", lambda: load_pipeline("summarization", summ))
+    pool.register("qg", lambda: load_pipeline("text2text-generation", qg))
+    ready = time.perf_counter() - start
+    if config == "lazy+asr":
+        pool.get("asr")
+    elif config in ("lazy+all", "budgeted"):
+        for name in ("asr", "summarizer", "qg"):
+            pool.get(name)
+    stats = pool.stats()
+
+print(json.dumps({{
+    "config": config,
+    "startup_s": ready if config == "lazy" else time.perf_counter() - start,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "loaded": [s["name"] for s in stats if s["loaded"]],
+}}))
+"""
+
+CONFIGS = ["eager", "lazy", "lazy+asr", "lazy+all", "budgeted"]
+
+
+def run(config, args):
+    env = dict(os.environ)
+    if config == "budgeted":
+        env["LETUNOTE_MODEL_BUDGET_MB"] = str(args.budget_mb)
+    code = CHILD.format(root=ROOT, config=config, asr=args.asr, summ=args.summarizer, qg=args.qg)
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--asr", default="openai/whisper-base")
+    parser.add_argument("--summarizer", default="facebook/bart-large-cnn")
+    parser.add_argument("--qg", default="valhalla/t5-small-qg-hl")
+    parser.add_argument("--budget-mb", type=int, default=1024)
+    parser.add_argument("--configs", nargs="+", default=CONFIGS, choices=CONFIGS)
+    args = parser.parse_args()
+
+    print(f"{'config':>10} {'startup s':>10} {'peak RSS MB':>12}  loaded")
+    for config in args.configs:
+        r = run(config, args)
+        print(f"{r['config']:>10} {r['startup_s']:>10.2f} {r['peak_rss_mb']:>12.0f}  {', '.join(r['loaded']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
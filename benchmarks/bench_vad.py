@@ -0,0 +1,71 @@
+# benchmarks/bench_vad.py
+"""
+Voice-activity pre-pass: how much audio it skips and what that saves.
+
+    python benchmarks/bench_vad.py "Lecture audio.mp3"
+    python benchmarks/bench_vad.py lecture.wav --asr openai/whisper-small --no-asr
+
+Reports the VAD run time, speech segments and the fraction of audio
+skipped, the number of Whisper windows with and without the pre-pass,
+and (unless --no-asr) transcription wall time for both paths.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from utils.audio import TARGET_SR, load_audio  # noqa: E402
+from utils.models import _iter_windows, load_whisper, stream_transcribe  # noqa: E402
+from utils.vad import detect_speech, speech_fraction  # noqa: E402
+
+
+def transcribe(samples, processor, asr_model, vad):
+    start = time.perf_counter()
+    pieces = list(stream_transcribe(samples, processor=processor, asr_model=asr_model, vad=vad))
+    return time.perf_counter() - start, " ".join(p.text for p in pieces)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("audio")
+    parser.add_argument("--asr", default="openai/whisper-base")
+    parser.add_argument("--no-asr", action="store_true", help="only time the VAD itself")
+    args = parser.parse_args()
+
+    samples = load_audio(args.audio)
+    duration = samples.size / TARGET_SR
+    print(f"audio: {args.audio} ({duration:.0f} s)")
+
+    detect_speech(samples[:TARGET_SR])  # librosa warm-up
+    start = time.perf_counter()
+    segments = detect_speech(samples)
+    vad_s = time.perf_counter() - start
+
+    speech = speech_fraction(segments, duration)
+    windows = sum(1 for _ in _iter_windows(iter([samples]), 30.0, 5.0))
+    print(f"VAD time:        {vad_s:.3f} s ({duration / max(vad_s, 1e-9):.0f}x real time)")
+    print(f"speech segments: {len(segments)}")
+    print(f"audio skipped:   {1 - speech:.1%} ({duration * (1 - speech):.1f} s)")
+    print(f"Whisper windows: {windows} fixed 30 s / 5 s overlap -> {len(segments)} with VAD")
+
+    if args.no_asr:
+        return
+
+    processor, asr_model = load_whisper(args.asr)
+    transcribe(np.zeros(TARGET_SR, dtype=np.float32), processor, asr_model, vad=False)  # warm-up
+
+    plain_s, plain = transcribe(samples, processor, asr_model, vad=False)
+    vad_asr_s, with_vad = transcribe(samples, processor, asr_model, vad=True)
+    saved = plain_s - vad_asr_s
+
+    print(f"transcribe:      {plain_s:.2f} s fixed windows, {vad_asr_s:.2f} s with VAD "
+          f"(saved {saved:.2f} s, {saved / max(plain_s, 1e-9):.0%})")
+    print(f"words:           {len(plain.split())} fixed windows, {len(with_vad.split())} with VAD")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/check_concurrent_jobs.py
+"""
+Concurrent-jobs check: several notes jobs sharing one model pool.
+
+    python benchmarks/check_concurrent_jobs.py
+    python benchmarks/check_concurrent_jobs.py --workers 4 --jobs 16
+
+Runs jobs through utils.jobs.JobQueue the way app.py does, with every
+worker thread taking the summarizer and question generator from a single
+ModelPool, half of them pipelined (utils.pipeline) and half stage by
+stage. Transcripts are synthetic, so Whisper is not involved. Exits 1 if
+any job fails, e.g. with "Already borrowed" from a tokenizer two threads
+are reconfiguring at once. Models default to the tiny stand-ins from
+benchmarks/tiny_models.py.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import transcript  # noqa: E402
+from tiny_models import build_tiny_models  # noqa: E402
+from utils.jobs import JobQueue, JobStore  # noqa: E402
+from utils.models import load_pipeline  # noqa: E402
+from utils.pipeline import run_pipelined  # noqa: E402
+from utils.questions import generate_question_list  # noqa: E402
+from utils.registry import ModelPool  # noqa: E402
+from utils.summarize import summarize_long  # noqa: E402
+
+SUMMARY_PARAMS = {"max_length": 60, "min_length": 10, "do_sample": False}
+
+
+def make_runner(pool):
+    def run_notes(audio, options, progress):
+        text = options["text"]
+        if options["pipelined"]:
+            with pool.use("summarizer") as summarizer, pool.use("qg") as qg:
+                # feed the transcript in pieces, as transcription would
+                words = text.split()
+                pieces = (" ".join(words[i:i + 80]) for i in range(0, len(words), 80))
+                _, summary, questions = run_pipelined(pieces, summarizer, qg, SUMMARY_PARAMS)
+        else:
+            with pool.use("summarizer") as summarizer:
+                summary = summarize_long(text, summarizer, **SUMMARY_PARAMS)
+            progress("generating questions", 0.5)
+            with pool.use("qg") as qg:
+                questions = generate_question_list(text, qg, max_questions=5)
+        return {"summary": summary, "questions": questions}
+
+    return run_notes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2, help="job worker threads")
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--words", type=int, default=20000,
+                        help="transcript length per job (about two hours of lecture)")
+    parser.add_argument("--models", default=os.path.join(tempfile.gettempdir(), "letunote-tiny"),
+                        help="where the tiny models are built when no model ids are given")
+    parser.add_argument("--summarizer")
+    parser.add_argument("--qg")
+    args = parser.parse_args()
+
+    tiny = build_tiny_models(args.models)
+    pool = ModelPool()
+    pool.register("summarizer", lambda: load_pipeline(
+        "summarization", args.summarizer or tiny["summarizer"], False, daemon=""
+    ))
+    pool.register("qg", lambda: load_pipeline(
+        "text2text-generation", args.qg or tiny["qg"], False, daemon=""
+    ))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(make_runner(pool), JobStore(os.path.join(tmp, "jobs.sqlite3")), args.workers)
+        start = time.perf_counter()
+        ids = [
+            queue.submit(None, {"text": transcript(args.words, seed=i), "pipelined": i % 2 == 0})
+            for i in range(args.jobs)
+        ]
+        while any(queue.get(i)["status"] in ("queued", "running") for i in ids):
+            time.sleep(0.1)
+        wall = time.perf_counter() - start
+
+        failed = [queue.get(i) for i in ids if queue.get(i)["status"] != "done"]
+        queue.pool.shutdown()
+
+    print(f"{args.jobs} jobs on {args.workers} workers in {wall:.1f} s, {len(failed)} failed")
+    for job in failed:
+        print(f"  {job['id']}: {job['status']} {job['error']}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
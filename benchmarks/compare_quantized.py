@@ -0,0 +1,139 @@
+# benchmarks/compare_quantized.py
+"""
+fp32 vs int8 ("fast CPU") comparison for the three models.
+
+    python benchmarks/compare_quantized.py "Lecture audio.mp3" --seconds 120
+    python benchmarks/compare_quantized.py lecture.wav --asr openai/whisper-small \
+        --summarizer sshleifer/distilbart-cnn-12-6 --threads 4
+
+Reports per precision: model load time, transcription latency and real-time
+factor (processing seconds per audio second), summary and question latency.
+Output drift of int8 is measured against the fp32 run: word error rate of
+the transcript and ROUGE-1 / ROUGE-L F1 of the summary.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.audio import audio_duration  # noqa: E402
+from utils.models import load_pipeline, load_whisper, stream_transcribe  # noqa: E402
+from utils.quantize import configure_threads  # noqa: E402
+from utils.questions import generate_question_list  # noqa: E402
+from utils.summarize import summarize_long  # noqa: E402
+from utils.text import clean_text  # noqa: E402
+
+
+def _words(text):
+    return clean_text(text).lower().split()
+
+
+def edit_distance(ref, hyp):
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1]
+
+
+def wer(reference, hypothesis):
+    ref, hyp = _words(reference), _words(hypothesis)
+    return edit_distance(ref, hyp) / max(1, len(ref))
+
+
+def _f1(overlap, n_ref, n_hyp):
+    if not overlap:
+        return 0.0
+    p, r = overlap / n_hyp, overlap / n_ref
+    return 2 * p * r / (p + r)
+
+
+def rouge1(reference, hypothesis):
+    from collections import Counter
+
+    ref, hyp = Counter(_words(reference)), Counter(_words(hypothesis))
+    return _f1(sum((ref & hyp).values()), sum(ref.values()), sum(hyp.values()))
+
+
+def rouge_l(reference, hypothesis):
+    ref, hyp = _words(reference), _words(hypothesis)
+    row = [0] * (len(hyp) + 1)
+    for r in ref:
+        prev = 0
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], prev + 1 if r == h else max(row[j], row[j - 1])
+    return _f1(row[-1], len(ref), len(hyp))
+
+
+def run(args, fast_cpu):
+    start = time.perf_counter()
+    processor, asr_model = load_whisper(args.asr, fast_cpu=fast_cpu)
+    summarizer = load_pipeline("summarization", args.summarizer, fast_cpu=fast_cpu)
+    qg = load_pipeline("text2text-generation", args.qg, fast_cpu=fast_cpu)
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pieces, audio_s = [], 0.0
+    for piece in stream_transcribe(args.audio, processor=processor, asr_model=asr_model):
+        pieces.append(piece.text)
+        audio_s = piece.end
+        if args.seconds and piece.end >= args.seconds:
+            break
+    asr_s = time.perf_counter() - start
+    transcript = clean_text(" ".join(pieces))
+
+    start = time.perf_counter()
+    summary = summarize_long(transcript, summarizer, max_length=200, min_length=70, do_sample=False)
+    summary_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    questions = generate_question_list(transcript, qg)
+    qg_s = time.perf_counter() - start
+
+    return {
+        "load_s": load_s,
+        "asr_s": asr_s,
+        "rtf": asr_s / max(audio_s, 1e-9),
+        "summary_s": summary_s,
+        "qg_s": qg_s,
+        "transcript": transcript,
+        "summary": summary,
+        "questions": questions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("audio")
+    parser.add_argument("--seconds", type=float, default=0, help="only transcribe the first N seconds")
+    parser.add_argument("--asr", default="openai/whisper-base")
+    parser.add_argument("--summarizer", default="facebook/bart-large-cnn")
+    parser.add_argument("--qg", default="valhalla/t5-small-qg-hl")
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads")
+    parser.add_argument("--interop-threads", type=int, default=0)
+    args = parser.parse_args()
+
+    configure_threads(args.threads, args.interop_threads)
+    print(f"audio: {args.audio} ({audio_duration(args.audio):.0f} s)")
+
+    fp32 = run(args, fast_cpu=False)
+    int8 = run(args, fast_cpu=True)
+
+    print(f"{'':>14} {'fp32':>9} {'int8':>9} {'speedup':>8}")
+    for key, label in [("load_s", "load s"), ("asr_s", "transcribe s"), ("rtf", "RTF"),
+                       ("summary_s", "summary s"), ("qg_s", "questions s")]:
+        a, b = fp32[key], int8[key]
+        print(f"{label:>14} {a:>9.3f} {b:>9.3f} {a / b if b else float('nan'):>7.2f}x")
+
+    print()
+    print(f"transcript WER (int8 vs fp32): {wer(fp32['transcript'], int8['transcript']):.3f}")
+    print(f"summary ROUGE-1 F1:            {rouge1(fp32['summary'], int8['summary']):.3f}")
+    print(f"summary ROUGE-L F1:            {rouge_l(fp32['summary'], int8['summary']):.3f}")
+    print(f"questions (fp32 / int8):       {len(fp32['questions'])} / {len(int8['questions'])}")
+
+
+if __name__ == "__main__":
+    main()
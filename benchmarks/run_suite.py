@@ -0,0 +1,246 @@
+# benchmarks/run_suite.py
+"""
+Offline benchmark suite: every pipeline stage across input sizes.
+
+    python benchmarks/run_suite.py -o results.json
+    python benchmarks/run_suite.py --quick --compare baseline.json
+    python benchmarks/run_suite.py --stages clean_text,create_pdf_export --repeat 5
+
+Needs no network: audio and transcripts are synthetic (benchmarks/
+synthetic.py), and Whisper, BART and T5 are tiny random stand-ins built
+locally (benchmarks/tiny_models.py). Timings therefore track the cost of
+our own code and of the model plumbing, not of the real checkpoints.
+
+The app's stage functions live in app.py, which draws the Streamlit page
+on import, so each stage here runs the same library calls they make:
+
+  clean_text            utils.text.clean_text
+  process_audio         load_audio from an in-memory WAV upload,
+                        stream_transcribe (VAD + batched decoding), clean_text
+  generate_summary      summarize_long + format_summary
+  generate_questions    generate_question_list + format_questions
+  create_pdf_export     utils.export.render_pdf (app PDF, memo bypassed)
+  create_pdf_helpers    utils.helpers.create_pdf
+
+Each case reports the median and minimum of --repeat runs after one
+warm-up. With --compare, cases whose median is more than --threshold
+slower than the baseline (and by more than --min-delta seconds) are
+flagged, and the exit status is 1.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+import soundfile as sf  # noqa: E402
+
+from synthetic import lecture_audio, transcript  # noqa: E402
+from tiny_models import build_tiny_models  # noqa: E402
+from utils.audio import TARGET_SR, load_audio  # noqa: E402
+from utils.export import NOTES, format_questions, format_summary, render_pdf  # noqa: E402
+from utils.helpers import create_pdf  # noqa: E402
+from utils.text import clean_text  # noqa: E402
+
+SIZES = {
+    "clean_text": ("words", [1_000, 10_000, 50_000]),
+    "process_audio": ("audio_s", [30, 120, 600]),
+    "generate_summary": ("words", [200, 1_000, 4_000]),
+    "generate_questions": ("words", [200, 1_000, 4_000]),
+    "create_pdf_export": ("words", [1_000, 10_000, 30_000]),
+    "create_pdf_helpers": ("words", [1_000, 10_000, 30_000]),
+}
+
+
+class Models:
+    """
+    The tiny models, loaded through the app's own loaders on first use.
+    """
+
+    def __init__(self, paths):
+        self.paths = paths
+        self._loaded = {}
+        self.load_s = {}
+
+    def get(self, name):
+        if name not in self._loaded:
+            from utils.models import load_pipeline, load_whisper
+
+            start = time.perf_counter()
+            if name == "asr":
+                self._loaded[name] = load_whisper(self.paths["asr"], fast_cpu=False)
+            else:
+                task = "summarization" if name == "summarizer" else "text2text-generation"
+                self._loaded[name] = load_pipeline(task, self.paths[name], fast_cpu=False)
+            self.load_s[name] = time.perf_counter() - start
+        return self._loaded[name]
+
+
+def case(stage, size, models, tmpdir):
+    """
+    A zero-argument callable running `stage` on a synthetic input of `size`.
+    """
+    if stage == "clean_text":
+        text = transcript(size, repeat_rate=0.05)
+        return lambda: clean_text(text)
+
+    if stage == "process_audio":
+        from utils.batching import BatchDecoder
+        from utils.models import stream_transcribe
+
+        buf = io.BytesIO()
+        sf.write(buf, lecture_audio(size), TARGET_SR, format="WAV", subtype="PCM_16")
+        processor, asr_model = models.get("asr")
+
+        def run():
+            buf.seek(0)
+            samples = load_audio(buf)
+            pieces = stream_transcribe(
+                samples, processor=processor, asr_model=asr_model,
+                decoder=BatchDecoder(processor, asr_model),
+            )
+            return clean_text(" ".join(p.text for p in pieces))
+        return run
+
+    if stage == "generate_summary":
+        from utils.summarize import summarize_long
+
+        text = clean_text(transcript(size))
+        summarizer = models.get("summarizer")
+        return lambda: format_summary(summarize_long(
+            text, summarizer, max_length=200, min_length=70, do_sample=False
+        ))
+
+    if stage == "generate_questions":
+        from utils.questions import generate_question_list
+
+        text = clean_text(transcript(size))
+        qg = models.get("qg")
+        return lambda: format_questions(generate_question_list(text, qg))
+
+    if stage == "create_pdf_export":
+        text = transcript(size)
+        sections = [("SUMMARY", text[:2000]), ("QUESTIONS", text[:500]), ("TRANSCRIPT", text)]
+        return lambda: render_pdf(sections, NOTES)
+
+    if stage == "create_pdf_helpers":
+        text = transcript(size)
+        path = os.path.join(tmpdir, "helpers.pdf")
+        return lambda: create_pdf(text, "Transcript", path)
+
+    raise ValueError(f"unknown stage {stage!r}")
+
+
+def measure(fn, repeat):
+    fn()  # warm-up: first-call imports, librosa/numba, allocator
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def environment():
+    import numpy
+    import torch
+    import transformers
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "torch": torch.__version__,
+        "transformers": transformers.__version__,
+        "torch_threads": torch.get_num_threads(),
+    }
+
+
+def compare(results, baseline, threshold, min_delta):
+    base = {(r["stage"], r["size"]): r for r in baseline["results"]}
+    regressions = 0
+
+    print(f"{'stage':<20} {'size':>8} {'median s':>10} {'baseline':>10} {'change':>8}")
+    for r in results:
+        old = base.get((r["stage"], r["size"]))
+        if old is None:
+            print(f"{r['stage']:<20} {r['size']:>8} {r['median_s']:>10.4f} {'-':>10} {'new':>8}")
+            continue
+
+        change = r["median_s"] / old["median_s"] - 1 if old["median_s"] else 0.0
+        slower = change > threshold and r["median_s"] - old["median_s"] > min_delta
+        regressions += slower
+        print(f"{r['stage']:<20} {r['size']:>8} {r['median_s']:>10.4f} {old['median_s']:>10.4f} "
+              f"{change:>+7.0%}{'  REGRESSION' if slower else ''}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown (0.15 = 15%%)")
+    parser.add_argument("--min-delta", type=float, default=0.002,
+                        help="ignore slowdowns smaller than this many seconds")
+    parser.add_argument("--stages", default=",".join(SIZES), help="comma-separated stages")
+    parser.add_argument("--quick", action="store_true", help="smallest size of each stage only")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--models", default=os.path.join(tempfile.gettempdir(), "letunote-tiny"),
+                        help="where the tiny models are built")
+    args = parser.parse_args()
+
+    models = Models(build_tiny_models(args.models))
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for stage in args.stages.split(","):
+            unit, sizes = SIZES[stage]
+            for size in sizes[:1] if args.quick else sizes:
+                runs = measure(case(stage, size, models, tmpdir), args.repeat)
+                results.append({
+                    "stage": stage,
+                    "size": size,
+                    "unit": unit,
+                    "median_s": statistics.median(runs),
+                    "min_s": min(runs),
+                    "runs": runs,
+                })
+                print(f"{stage:<20} {size:>8} {unit:<8} median {results[-1]['median_s']:.4f} s")
+
+    report = {"environment": environment(), "model_load_s": models.load_s, "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print()
+        if compare(results, baseline, args.threshold, args.min_delta):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/synthetic.py
+"""
+Synthetic lecture inputs for the offline benchmark suite: speech-like
+audio with pauses, and transcripts with Whisper-style repetition loops.
+Everything is seeded, so a given size always produces the same input.
+"""
+import numpy as np
+
+from utils.audio import TARGET_SR
+
+VOCAB = (
+    "gradient descent network layer weight bias loss function model training "
+    "data set vector matrix derivative chain rule error output input value "
+    "step rate batch epoch sample feature label class accuracy test"
+).split()
+
+
+def lecture_audio(
+    seconds: float,
+    speech_ratio: float = 0.8,
+    noise_db: float = -50.0,
+    sr: int = TARGET_SR,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Mono float32 audio made of "utterances" (harmonic tones with a
+    drifting pitch and a ~4 Hz syllable envelope) separated by pauses of
+    low-level noise. `speech_ratio` is roughly the share of utterances.
+    """
+    rng = np.random.default_rng(seed)
+    out = np.empty(int(seconds * sr), dtype=np.float32)
+    noise = 10 ** (noise_db / 20)
+    pos = 0
+
+    while pos < out.size:
+        speech = rng.random() < speech_ratio
+        length = min(int(rng.uniform(2.0, 12.0) * sr), out.size - pos)
+        t = np.arange(length) / sr
+
+        if speech:
+            f0 = rng.uniform(100, 220) * (1 + 0.1 * np.sin(2 * np.pi * rng.uniform(0.1, 0.5) * t))
+            phase = 2 * np.pi * np.cumsum(f0) / sr
+            voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+            envelope = 0.5 * (1 + np.sin(2 * np.pi * rng.uniform(3, 5) * t)) ** 2
+            chunk = 0.2 * voice * envelope
+        else:
+            chunk = np.zeros(length)
+
+        out[pos:pos + length] = chunk + noise * rng.standard_normal(length)
+        pos += length
+
+    return out
+
+
+def transcript(words: int, repeat_rate: float = 0.02, seed: int = 0) -> str:
+    """
+    Lecture-like text of about `words` words. At roughly `repeat_rate` of
+    the sentences, a phrase or word is looped a few times, the way Whisper
+    hallucinates, to give clean_text real work.
+    """
+    rng = np.random.default_rng(seed)
+    out = []
+    while len(out) < words:
+        sentence = [VOCAB[i] for i in rng.integers(0, len(VOCAB), rng.integers(6, 18))]
+        sentence[0] = sentence[0].capitalize()
+        if rng.random() < repeat_rate:
+            n = int(rng.integers(1, 7))
+            sentence += sentence[-n:] * int(rng.integers(3, 12))
+        out.extend(sentence)
+        out[-1] += "."
+    return " ".join(out)
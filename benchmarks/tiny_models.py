@@ -0,0 +1,148 @@
+# benchmarks/tiny_models.py
+"""
+Tiny, randomly initialised stand-ins for the hub checkpoints, built
+locally so benchmarks run with no network access.
+
+    python benchmarks/tiny_models.py /tmp/letunote-tiny
+
+Writes whisper/, bart/ and t5/ under the target directory. Each one loads
+with utils.models.load_whisper / load_pipeline in place of openai/whisper-*,
+facebook/bart-large-cnn and valhalla/t5-small-qg-hl. The weights are
+random (seeded), so the outputs are gibberish, but the code paths and
+tensor shapes match the real models and timings are reproducible.
+"""
+import os
+import sys
+
+CORPUS = ["the lecture covers gradient descent and neural networks in detail"] * 10
+WHISPER_SPECIAL = ["<|endoftext|>", "<|startoftranscript|>", "<|en|>", "<|transcribe|>", "<|notimestamps|>"]
+BART_SPECIAL = ["<s>", "<pad>", "</s>", "<unk>", "<mask>"]
+T5_SPECIAL = ["<pad>", "</s>", "<unk>", "<hl>"]
+
+
+def _bpe(special):
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+
+    tok = Tokenizer(models.BPE())
+    tok.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tok.decoder = decoders.ByteLevel()
+    tok.train_from_iterator(CORPUS, trainers.BpeTrainer(
+        vocab_size=300,
+        special_tokens=special,
+        initial_alphabet=pre_tokenizers.ByteLevel.alphabet(),
+        show_progress=False,
+    ))
+    return tok
+
+
+def _whisper(path):
+    import torch
+    from transformers import (
+        GenerationConfig,
+        WhisperConfig,
+        WhisperFeatureExtractor,
+        WhisperForConditionalGeneration,
+        WhisperProcessor,
+        WhisperTokenizerFast,
+    )
+
+    os.makedirs(path, exist_ok=True)
+    _bpe(WHISPER_SPECIAL).model.save(path)
+    tokenizer = WhisperTokenizerFast(
+        vocab_file=os.path.join(path, "vocab.json"),
+        merges_file=os.path.join(path, "merges.txt"),
+        unk_token="<|endoftext|>",
+        bos_token="<|endoftext|>",
+        eos_token="<|endoftext|>",
+        pad_token="<|endoftext|>",
+    )
+    tokenizer.add_special_tokens({"additional_special_tokens": WHISPER_SPECIAL[1:]})
+    start = tokenizer.convert_tokens_to_ids("<|startoftranscript|>")
+
+    torch.manual_seed(0)
+    model = WhisperForConditionalGeneration(WhisperConfig(
+        vocab_size=len(tokenizer), d_model=32, encoder_layers=1, decoder_layers=1,
+        encoder_attention_heads=2, decoder_attention_heads=2,
+        encoder_ffn_dim=64, decoder_ffn_dim=64,
+        max_source_positions=1500, max_target_positions=64,
+        decoder_start_token_id=start, eos_token_id=0, pad_token_id=0, bos_token_id=0,
+    ))
+    model.generation_config = GenerationConfig(
+        decoder_start_token_id=start, eos_token_id=0, pad_token_id=0, max_length=24
+    )
+    model.save_pretrained(path)
+    WhisperProcessor(WhisperFeatureExtractor(), tokenizer).save_pretrained(path)
+
+
+def _seq2seq(path, special, tokens, config, max_length):
+    import torch
+    from transformers import PreTrainedTokenizerFast
+
+    os.makedirs(path, exist_ok=True)
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=_bpe(special),
+        model_max_length=max_length,
+        model_input_names=["input_ids", "attention_mask"],
+        **tokens,
+    )
+    torch.manual_seed(0)
+    model = config(len(tokenizer))
+    model.generation_config.max_length = 48
+    if tokens.get("bos_token"):
+        model.generation_config.forced_bos_token_id = tokenizer.bos_token_id
+    model.save_pretrained(path)
+    tokenizer.save_pretrained(path)
+
+
+def _bart(vocab_size):
+    from transformers import BartConfig, BartForConditionalGeneration
+
+    return BartForConditionalGeneration(BartConfig(
+        vocab_size=vocab_size, d_model=32, encoder_layers=1, decoder_layers=1,
+        encoder_attention_heads=2, decoder_attention_heads=2,
+        encoder_ffn_dim=64, decoder_ffn_dim=64, max_position_embeddings=1024,
+        pad_token_id=1, bos_token_id=0, eos_token_id=2,
+        decoder_start_token_id=2,
+    ))
+
+
+def _t5(vocab_size):
+    from transformers import T5Config, T5ForConditionalGeneration
+
+    return T5ForConditionalGeneration(T5Config(
+        vocab_size=vocab_size, d_model=32, d_kv=8, d_ff=64, num_layers=1, num_heads=2,
+        pad_token_id=0, eos_token_id=1, decoder_start_token_id=0,
+    ))
+
+
+def build_tiny_models(root: str) -> dict:
+    """
+    Build (or reuse) the three stand-in models under `root`.
+    Returns {"asr": path, "summarizer": path, "qg": path}.
+    """
+    paths = {
+        "asr": os.path.join(root, "whisper"),
+        "summarizer": os.path.join(root, "bart"),
+        "qg": os.path.join(root, "t5"),
+    }
+    if not os.path.exists(os.path.join(paths["asr"], "config.json")):
+        _whisper(paths["asr"])
+    # 1024 / 512 token contexts as in the real checkpoints, so texts are
+    # chunked the way they are in production
+    if not os.path.exists(os.path.join(paths["summarizer"], "config.json")):
+        _seq2seq(paths["summarizer"], BART_SPECIAL, {
+            "bos_token": "<s>", "pad_token": "<pad>", "eos_token": "</s>",
+            "unk_token": "<unk>", "mask_token": "<mask>",
+        }, _bart, 1024)
+    if not os.path.exists(os.path.join(paths["qg"], "config.json")):
+        _seq2seq(paths["qg"], T5_SPECIAL, {
+            "pad_token": "<pad>", "eos_token": "</s>", "unk_token": "<unk>",
+        }, _t5, 512)
+    return paths
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit(__doc__.strip())
+    for name, path in build_tiny_models(sys.argv[1]).items():
+        print(f"{name:>10}: {path}")
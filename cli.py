@@ -0,0 +1,178 @@
+# cli.py
+"""
+Headless batch notes: transcript, summary, questions and PDF per lecture.
+
+    python cli.py recordings/ -o notes/
+    python cli.py "semester/**/*.mp3" -o notes/ --workers 4 --threads 2
+    python cli.py lecture.wav -o notes/ --questions 15 --force
+
+Each lecture gets notes/<name>/ with transcript.txt, summary.md,
+questions.md and notes.pdf. Lectures whose outputs are newer than the
+audio are skipped unless --force is given. Files are spread across
+worker processes that each load the models once; keep
+workers x threads at or below the number of cores.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+from utils.config import QG_MAX_QUESTIONS
+
+AUDIO_TYPES = (".wav", ".mp3")
+OUTPUTS = ("transcript.txt", "summary.md", "questions.md", "notes.pdf")
+
+
+def find_audio(target: str) -> list:
+    if os.path.isdir(target):
+        pattern = os.path.join(target, "**", "*")
+    else:
+        pattern = target
+    return sorted(
+        p for p in glob.glob(pattern, recursive=True)
+        if os.path.isfile(p) and p.lower().endswith(AUDIO_TYPES)
+    )
+
+
+def output_dir(path: str, base: str, out_root: str) -> str:
+    rel = os.path.relpath(os.path.splitext(path)[0], base)
+    return os.path.join(out_root, rel)
+
+
+def up_to_date(path: str, out_dir: str) -> bool:
+    audio_mtime = os.path.getmtime(path)
+    for name in OUTPUTS:
+        out = os.path.join(out_dir, name)
+        if not os.path.exists(out) or os.path.getmtime(out) < audio_mtime:
+            return False
+    return True
+
+
+def _init_worker(threads: int):
+    from utils.quantize import configure_threads
+
+    configure_threads(threads, 1)
+
+
+def process_file(path: str, out_dir: str, max_questions: int) -> dict:
+    """
+    Notes for one lecture; runs in a worker process, where the models
+    stay loaded between files.
+    """
+    from utils.audio import audio_duration
+    from utils.cache import hash_file, make_key
+    from utils.config import FAST_CPU
+    from utils.export import format_questions, format_summary, render_notes_pdf
+    from utils.journal import TranscriptJournal
+    from utils.metrics import run, stage
+    from utils.models import (
+        ASR_MODEL,
+        ASR_PARAMS,
+        generate_questions,
+        summarize_text,
+        transcribe_audio,
+    )
+    from utils.text import clean_text
+
+    with run(path), stage("total"):
+        # a rerun after a crash resumes transcription from the checkpoints;
+        # keyed like the app's transcripts, so a model or window change
+        # never replays another configuration's windows
+        precision = "int8" if FAST_CPU else "fp32"
+        with open(path, "rb") as f:
+            key = make_key(hash_file(f), ASR_MODEL, precision, **ASR_PARAMS)
+        journal = TranscriptJournal.for_key(key)
+
+        audio_s = audio_duration(path)
+        start = time.perf_counter()
+        with stage("whisper", audio_s=audio_s):
+            transcript = clean_text(transcribe_audio(path, journal))
+        if not transcript:
+            raise RuntimeError("Whisper returned empty transcript.")
+        asr_s = time.perf_counter() - start
+
+        summary = format_summary(summarize_text(transcript))
+        questions = format_questions(generate_questions(transcript, max_questions))
+        pdf = render_notes_pdf(transcript, summary, questions)
+
+        os.makedirs(out_dir, exist_ok=True)
+        contents = dict(zip(OUTPUTS, (transcript, summary, questions, pdf)))
+        for name, data in contents.items():
+            tmp = os.path.join(out_dir, f".{name}.tmp")
+            mode = "wb" if isinstance(data, bytes) else "w"
+            with open(tmp, mode, **({} if mode == "wb" else {"encoding": "utf-8"})) as f:
+                f.write(data)
+            os.replace(tmp, os.path.join(out_dir, name))
+        journal.complete()
+
+        return {
+            "audio_s": audio_s,
+            "asr_s": asr_s,
+            "wall_s": time.perf_counter() - start,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="audio file, directory, or glob (quote it)")
+    parser.add_argument("-o", "--out", default="notes", help="output directory")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="torch threads per worker (default: cores / workers)")
+    parser.add_argument("--questions", type=int, default=QG_MAX_QUESTIONS)
+    parser.add_argument("--force", action="store_true", help="redo lectures that are up to date")
+    args = parser.parse_args()
+
+    files = find_audio(args.input)
+    if not files:
+        sys.exit(f"no {'/'.join(AUDIO_TYPES)} files match {args.input}")
+
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in files])
+    jobs = [(p, output_dir(os.path.abspath(p), base, args.out)) for p in files]
+    todo = [(p, d) for p, d in jobs if args.force or not up_to_date(p, d)]
+    print(f"{len(files)} lectures, {len(files) - len(todo)} up to date, {len(todo)} to process")
+    if not todo:
+        return
+
+    workers = max(1, min(args.workers, len(todo)))
+    threads = args.threads or max(1, (os.cpu_count() or 1) // workers)
+    print(f"{workers} workers x {threads} torch threads")
+
+    start = time.perf_counter()
+    audio_total, failed = 0.0, 0
+    # spawn: workers must not inherit a forked torch/OpenMP state
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads,),
+    ) as pool:
+        futures = {
+            pool.submit(process_file, p, d, args.questions): p for p, d in todo
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                stats = future.result()
+            except Exception as exc:
+                failed += 1
+                print(f"FAILED {path}: {exc}")
+                continue
+
+            audio_total += stats["audio_s"]
+            print(f"done   {path}: {stats['audio_s'] / 60:.1f} min audio in "
+                  f"{stats['wall_s']:.1f} s ({stats['audio_s'] / stats['wall_s']:.1f}x real time, "
+                  f"transcription {stats['asr_s']:.1f} s)")
+
+    wall = time.perf_counter() - start
+    print(f"total  {len(todo) - failed} lectures, {audio_total / 3600:.2f} h audio in "
+          f"{wall / 60:.1f} min ({audio_total / max(wall, 1e-9):.1f}x real time)")
+    if failed:
+        sys.exit(f"{failed} lectures failed")
+
+
+if __name__ == "__main__":
+    main()
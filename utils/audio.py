@@ -0,0 +1,95 @@
+# utils/audio.py
+import tempfile
+
+import numpy as np
+import soundfile as sf
+import soxr
+
+from utils.config import AUDIO_MMAP_MB
+
+TARGET_SR = 16000
+
+
+def _blocks(f: sf.SoundFile, sr: int, block_s: float):
+    """
+    Mono float32 blocks at `sr` from an open SoundFile.
+    """
+    native_sr = f.samplerate
+    block_frames = max(1, int(block_s * native_sr))
+
+    resampler = None
+    if native_sr != sr:
+        resampler = soxr.ResampleStream(native_sr, sr, 1, dtype="float32")
+
+    for block in f.blocks(blocksize=block_frames, dtype="float32", always_2d=True):
+        mono = block.mean(axis=1, dtype=np.float32)
+        if resampler is not None:
+            mono = resampler.resample_chunk(mono)
+        if mono.size:
+            yield mono
+
+    if resampler is not None:
+        tail = resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+        if tail.size:
+            yield tail
+
+
+def stream_audio(source, sr: int = TARGET_SR, block_s: float = 10.0):
+    """
+    Read an audio file block by block as mono float32 at `sr`.
+    Only one block is held in memory at a time, so long lectures
+    do not need to be decoded up front.
+    """
+    with sf.SoundFile(source) as f:
+        yield from _blocks(f, sr, block_s)
+
+
+def _scratch(size: int, mmap_mb: int) -> np.ndarray:
+    if mmap_mb and size * 4 > mmap_mb * 1024 * 1024:
+        # TemporaryFile is unlinked on creation, so nothing is left behind
+        # however the caller exits
+        return np.memmap(tempfile.TemporaryFile(), dtype=np.float32, mode="w+", shape=(size,))
+    return np.empty(size, dtype=np.float32)
+
+
+def load_audio(
+    source,
+    sr: int = TARGET_SR,
+    block_s: float = 10.0,
+    mmap_mb: int = AUDIO_MMAP_MB,
+) -> np.ndarray:
+    """
+    Decode a path or file object (e.g. a Streamlit upload) into one mono
+    float32 array at `sr`, resampling block by block into a buffer sized
+    from the file header. File objects are read in place and their
+    position is restored.
+    """
+    start = source.tell() if hasattr(source, "tell") else None
+
+    try:
+        with sf.SoundFile(source) as f:
+            # slack for resampler rounding and inexact compressed-frame counts
+            expected = int(np.ceil(max(f.frames, 0) * sr / f.samplerate)) + sr
+            buf = _scratch(expected, mmap_mb)
+            filled = 0
+
+            for block in _blocks(f, sr, block_s):
+                if filled + block.size > buf.size:
+                    grown = _scratch(max(buf.size * 3 // 2, filled + block.size), mmap_mb)
+                    grown[:filled] = buf[:filled]
+                    buf = grown
+                buf[filled:filled + block.size] = block
+                filled += block.size
+    finally:
+        if start is not None:
+            source.seek(start)
+
+    return buf[:filled]
+
+
+def audio_duration(source) -> float:
+    """
+    Length of an audio file in seconds, read from its header.
+    """
+    info = sf.info(source)
+    return info.frames / info.samplerate
@@ -0,0 +1,109 @@
+# utils/batching.py
+import time
+
+from utils.audio import TARGET_SR
+from utils.config import ASR_BATCH_MB, ASR_BATCH_SIZE
+
+
+def per_item_mb(config) -> float:
+    """
+    Rough peak memory one input adds to a Whisper batch: encoder output,
+    the decoder's cross-attention key/value cache and one layer's
+    attention scores. Every input is padded to 30 s (1500 encoder frames),
+    so this does not depend on the segment length.
+    """
+    frames = config.max_source_positions
+    hidden = frames * config.d_model * 4
+    cross_kv = 2 * config.decoder_layers * hidden
+    scores = config.encoder_attention_heads * frames * frames * 4
+    return (hidden + cross_kv + scores) / (1024 * 1024)
+
+
+class BatchDecoder:
+    """
+    Batched Whisper decoding of audio windows or VAD segments.
+
+    Windows are decoded `batch_size` at a time and results are yielded as
+    soon as every earlier window is done, so partial transcripts, progress
+    callbacks and journal checkpoints follow each batch. With `lookahead`
+    above 1, that many batches are collected and sorted by duration first,
+    so each batch holds segments of similar length and generate() pads
+    short outputs less; this delays the first result, and since Whisper
+    pads every input to 30 s it rarely pays off.
+    """
+
+    def __init__(
+        self,
+        processor,
+        asr_model,
+        batch_size: int = ASR_BATCH_SIZE,
+        budget_mb: int = ASR_BATCH_MB,
+        lookahead: int = 1,
+    ):
+        self.processor = processor
+        self.asr_model = asr_model
+        if batch_size <= 0:
+            batch_size = int(budget_mb // per_item_mb(asr_model.config))
+        self.batch_size = max(1, batch_size)
+        self.lookahead = max(1, lookahead)
+        self.stats = {"windows": 0, "batches": 0, "audio_s": 0.0, "wall_s": 0.0}
+
+    @property
+    def throughput(self) -> float:
+        """
+        Audio seconds fed to Whisper per wall-clock second so far.
+        """
+        return self.stats["audio_s"] / max(self.stats["wall_s"], 1e-9)
+
+    def decode(self, windows: list) -> list:
+        """
+        Transcribe one batch of sample arrays.
+        """
+        import torch
+
+        start = time.perf_counter()
+        inputs = self.processor(
+            windows,
+            sampling_rate=TARGET_SR,
+            return_tensors="pt"
+        ).to(self.asr_model.device)
+
+        with torch.no_grad():
+            predicted_ids = self.asr_model.generate(inputs.input_features)
+
+        texts = self.processor.batch_decode(predicted_ids, skip_special_tokens=True)
+
+        self.stats["windows"] += len(windows)
+        self.stats["batches"] += 1
+        self.stats["audio_s"] += sum(w.size for w in windows) / TARGET_SR
+        self.stats["wall_s"] += time.perf_counter() - start
+        return [t.strip() for t in texts]
+
+    def _flush(self, group: list):
+        order = sorted(range(len(group)), key=lambda i: group[i][-1].size)
+        texts = [None] * len(group)
+        ready = 0
+
+        for b in range(0, len(order), self.batch_size):
+            idx = order[b:b + self.batch_size]
+            for i, text in zip(idx, self.decode([group[i][-1] for i in idx])):
+                texts[i] = text
+
+            # hand back every result whose predecessors are all decoded
+            while ready < len(group) and texts[ready] is not None:
+                yield group[ready][:-1] + (texts[ready],)
+                ready += 1
+
+    def stream(self, items):
+        """
+        Transcribe (..., samples) tuples, yielding (..., text) in input
+        order as soon as each one and all before it are decoded.
+        """
+        group = []
+        for item in items:
+            group.append(item)
+            if len(group) == self.batch_size * self.lookahead:
+                yield from self._flush(group)
+                group = []
+        if group:
+            yield from self._flush(group)
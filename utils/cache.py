@@ -0,0 +1,111 @@
+# utils/cache.py
+import hashlib
+import json
+import os
+import tempfile
+
+from utils.config import CACHE_DIR, CACHE_MAX_MB
+
+
+def hash_file(fileobj, chunk_size: int = 1 << 20) -> str:
+    """
+    SHA-256 of an open binary file, read in chunks.
+    The file position is restored afterwards so callers can still read it.
+    """
+    digest = hashlib.sha256()
+    pos = fileobj.tell()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(chunk_size), b""):
+        digest.update(chunk)
+    fileobj.seek(pos)
+    return digest.hexdigest()
+
+
+def make_key(*parts, **params) -> str:
+    """
+    Build a cache key from the input hash, model ID and generation parameters.
+    """
+    blob = json.dumps([parts, params], sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed JSON cache on disk, one directory per pipeline stage.
+    Writes are atomic (temp file + rename), so several Streamlit sessions
+    can share it. Least recently used entries are evicted once the total
+    size exceeds `max_mb`.
+    The cache gets a `results` directory of its own under CACHE_DIR, since
+    eviction deletes any *.json under `root` and other stores (journals,
+    metrics, models) live alongside it.
+    """
+
+    def __init__(self, root: str = os.path.join(CACHE_DIR, "results"), max_mb: int = CACHE_MAX_MB):
+        self.root = root
+        self.max_bytes = max_mb * 1024 * 1024
+
+    def _path(self, stage: str, key: str) -> str:
+        return os.path.join(self.root, stage, key[:2], f"{key}.json")
+
+    def get(self, stage: str, key: str, default=None):
+        path = self._path(stage, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError):
+            return default
+        return value
+
+    def put(self, stage: str, key: str, value) -> None:
+        path = self._path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        self._evict()
+
+    def fetch(self, stage: str, key: str, compute):
+        """
+        Return the cached value for `key`, computing and storing it on a miss.
+        """
+        value = self.get(stage, key)
+        if value is None:
+            value = compute()
+            self.put(stage, key, value)
+        return value
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
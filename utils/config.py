@@ -0,0 +1,93 @@
+# utils/config.py
+import os
+
+# Runtime settings, overridable through environment variables so the
+# same code runs on Streamlit Cloud, Hugging Face Spaces and locally.
+
+CACHE_DIR = os.environ.get(
+    "LETUNOTE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "letunote")
+)
+CACHE_MAX_MB = int(os.environ.get("LETUNOTE_CACHE_MAX_MB", "512"))
+
+# Map-reduce summarization: chunks per pipeline call, and how many
+# batches run at once ("thread" shares one model, "process" loads one per worker)
+SUMMARY_BATCH_SIZE = int(os.environ.get("LETUNOTE_SUMMARY_BATCH_SIZE", "4"))
+SUMMARY_WORKERS = int(os.environ.get("LETUNOTE_SUMMARY_WORKERS", "1"))
+SUMMARY_EXECUTOR = os.environ.get("LETUNOTE_SUMMARY_EXECUTOR", "thread")
+
+# Question generation: cap per lecture and prompts per pipeline call
+QG_MAX_QUESTIONS = int(os.environ.get("LETUNOTE_QG_MAX_QUESTIONS", "10"))
+QG_BATCH_SIZE = int(os.environ.get("LETUNOTE_QG_BATCH_SIZE", "16"))
+
+# Background note-generation jobs: state database and worker threads
+JOBS_DB = os.environ.get("LETUNOTE_JOBS_DB", os.path.join(CACHE_DIR, "jobs.sqlite3"))
+JOB_WORKERS = int(os.environ.get("LETUNOTE_JOB_WORKERS", "2"))
+
+# Models are loaded when their stage first runs; idle ones are evicted
+# once loaded models exceed this many MB (0 = never evict)
+MODEL_BUDGET_MB = int(os.environ.get("LETUNOTE_MODEL_BUDGET_MB", "0"))
+
+# "Fast CPU" mode: int8 dynamic quantization of Whisper, BART and T5,
+# with quantized weights cached under QUANT_DIR after the first load
+FAST_CPU = os.environ.get("LETUNOTE_FAST_CPU", "0").lower() in ("1", "true", "yes")
+QUANT_DIR = os.environ.get("LETUNOTE_QUANT_DIR", os.path.join(CACHE_DIR, "int8"))
+
+# torch intra-op / inter-op thread counts (0 = torch default)
+TORCH_THREADS = int(os.environ.get("LETUNOTE_TORCH_THREADS", "0"))
+TORCH_INTEROP_THREADS = int(os.environ.get("LETUNOTE_TORCH_INTEROP_THREADS", "0"))
+
+# Overlap cleaning, summarization and question generation with transcription
+PIPELINE = os.environ.get("LETUNOTE_PIPELINE", "1").lower() in ("1", "true", "yes")
+PIPELINE_QUEUE_SIZE = int(os.environ.get("LETUNOTE_PIPELINE_QUEUE_SIZE", "4"))
+QG_PER_CHUNK = int(os.environ.get("LETUNOTE_QG_PER_CHUNK", "3"))
+
+# Decoded uploads longer than this many MB of 16 kHz float32 samples go to an
+# anonymous memory-mapped scratch file instead of RAM (0 = always RAM)
+AUDIO_MMAP_MB = int(os.environ.get("LETUNOTE_AUDIO_MMAP_MB", "256"))
+
+# Skip silence before Whisper: only speech segments found by utils.vad
+# are transcribed
+VAD = os.environ.get("LETUNOTE_VAD", "1").lower() in ("1", "true", "yes")
+
+# Whisper inputs decoded per generate() call; 0 sizes batches so their
+# activations fit in ASR_BATCH_MB
+ASR_BATCH_SIZE = int(os.environ.get("LETUNOTE_ASR_BATCH_SIZE", "0"))
+ASR_BATCH_MB = int(os.environ.get("LETUNOTE_ASR_BATCH_MB", "1024"))
+
+# Per-recording transcription checkpoints, removed once the transcript is saved
+JOURNAL_DIR = os.environ.get("LETUNOTE_JOURNAL_DIR", os.path.join(CACHE_DIR, "journal"))
+
+# Per-stage timings: JSON lines and a Prometheus text-format file under
+# METRICS_DIR, plus a sidebar panel with the last METRICS_RUNS runs
+METRICS = os.environ.get("LETUNOTE_METRICS", "0").lower() in ("1", "true", "yes")
+METRICS_DIR = os.environ.get("LETUNOTE_METRICS_DIR", os.path.join(CACHE_DIR, "metrics"))
+METRICS_RUNS = int(os.environ.get("LETUNOTE_METRICS_RUNS", "5"))
+
+# Searchable lecture library: timestamped segments and an inverted index.
+# There is one library per server and every visitor can search it, so it is
+# off by default; turn it on for single-user or local deployments. Copies of
+# uploads (for playback from a search hit) are only kept when
+# LIBRARY_AUDIO_MAX_MB is set, oldest evicted first beyond that size
+LIBRARY = os.environ.get("LETUNOTE_LIBRARY", "0").lower() in ("1", "true", "yes")
+LIBRARY_DB = os.environ.get("LETUNOTE_LIBRARY_DB", os.path.join(CACHE_DIR, "library.sqlite3"))
+LIBRARY_AUDIO_DIR = os.environ.get("LETUNOTE_LIBRARY_AUDIO_DIR", os.path.join(CACHE_DIR, "library"))
+LIBRARY_AUDIO_MAX_MB = int(os.environ.get("LETUNOTE_LIBRARY_AUDIO_MAX_MB", "0"))
+
+# Shared inference daemon (python -m utils.daemon): a Unix socket path or
+# host:port. When set, models run in that one process instead of in every
+# app / CLI process. Requests are collected for DAEMON_WINDOW_MS into
+# batches of up to DAEMON_MAX_BATCH inputs; past DAEMON_QUEUE waiting
+# requests new ones are refused, and any request is dropped after
+# DAEMON_TIMEOUT seconds.
+# Connections carry pickles, so the shared key is required: DAEMON_KEY, or
+# a random key the daemon writes to DAEMON_KEY_FILE (mode 0600) on first
+# start. TCP addresses other than loopback need DAEMON_ALLOW_REMOTE
+DAEMON = os.environ.get("LETUNOTE_DAEMON", "")
+DAEMON_KEY = os.environ.get("LETUNOTE_DAEMON_KEY", "")
+DAEMON_KEY_FILE = os.environ.get("LETUNOTE_DAEMON_KEY_FILE", os.path.join(CACHE_DIR, "daemon.key"))
+DAEMON_ALLOW_REMOTE = os.environ.get("LETUNOTE_DAEMON_ALLOW_REMOTE", "0").lower() in ("1", "true", "yes")
+DAEMON_WINDOW_MS = float(os.environ.get("LETUNOTE_DAEMON_WINDOW_MS", "10"))
+DAEMON_MAX_BATCH = int(os.environ.get("LETUNOTE_DAEMON_MAX_BATCH", "16"))
+DAEMON_QUEUE = int(os.environ.get("LETUNOTE_DAEMON_QUEUE", "64"))
+DAEMON_TIMEOUT = float(os.environ.get("LETUNOTE_DAEMON_TIMEOUT", "600"))
@@ -0,0 +1,513 @@
+# utils/daemon.py
+"""
+Shared local inference service.
+
+One process per host owns the Whisper, summarization and question
+generation models and serves every Streamlit process, replica and CLI
+worker on the machine, so model memory is paid once:
+
+    python -m utils.daemon --address /tmp/letunote.sock
+    LETUNOTE_DAEMON=/tmp/letunote.sock streamlit run app.py
+
+Requests that arrive within a short window and target the same model with
+the same generation settings are run as one batched forward pass.
+Clients authenticate with a shared key (see load_key).
+"""
+import argparse
+import ipaddress
+import itertools
+import os
+import queue
+import secrets
+import threading
+import time
+from collections import deque
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener, answer_challenge, deliver_challenge
+from types import SimpleNamespace
+
+from utils.config import (
+    DAEMON,
+    DAEMON_ALLOW_REMOTE,
+    DAEMON_KEY,
+    DAEMON_KEY_FILE,
+    DAEMON_MAX_BATCH,
+    DAEMON_QUEUE,
+    DAEMON_TIMEOUT,
+    DAEMON_WINDOW_MS,
+    FAST_CPU,
+)
+from utils.registry import ModelPool
+
+
+class DaemonBusy(RuntimeError):
+    """The daemon's request queue is full; retry later or run locally."""
+
+
+def parse_address(address: str):
+    """
+    "host:port" is a TCP address; anything else is a Unix socket path.
+    """
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address:
+        return host or "127.0.0.1", int(port)
+    return address
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def load_key(create: bool = False, path: str = DAEMON_KEY_FILE) -> bytes:
+    """
+    The shared secret clients authenticate with: LETUNOTE_DAEMON_KEY if set,
+    otherwise the contents of the key file. With `create` (the daemon) a
+    missing file is filled with a random key, readable by its owner only;
+    clients running as the same user pick it up. There is no default key:
+    connections unpickle what they receive, so the key is what keeps other
+    users and hosts from running code in the daemon.
+    """
+    if DAEMON_KEY:
+        return DAEMON_KEY.encode()
+
+    try:
+        with open(path, "rb") as f:
+            if os.name == "posix" and os.fstat(f.fileno()).st_mode & 0o077:
+                raise PermissionError(f"{path} is readable by other users; chmod 600 it")
+            key = f.read().strip()
+    except FileNotFoundError:
+        if not create:
+            raise ConnectionError(
+                f"no inference daemon key: set LETUNOTE_DAEMON_KEY or start the daemon to create {path}"
+            ) from None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        key = secrets.token_hex(32).encode()
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            return load_key(False, path)  # another daemon created it first
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+
+    if not key:
+        raise ValueError(f"{path} is empty")
+    return key
+
+
+class DaemonClient:
+    """
+    Sends one request per connection, so a request that times out never
+    leaves a late reply behind for the next caller.
+    """
+
+    def __init__(self, address: str = DAEMON, authkey: bytes = None, timeout: float = DAEMON_TIMEOUT):
+        self.address = parse_address(address)
+        self.authkey = authkey or load_key()
+        self.timeout = timeout
+
+    def request(self, op: str, **payload):
+        try:
+            conn = Client(self.address, authkey=self.authkey)
+        except OSError as exc:
+            raise ConnectionError(f"inference daemon not reachable at {self.address}: {exc}") from exc
+
+        with conn:
+            conn.send({"op": op, "timeout": self.timeout, **payload})
+            # a little slack so the daemon's own timeout reply wins the race
+            if not conn.poll(self.timeout + 1.0):
+                raise TimeoutError(f"inference daemon did not answer within {self.timeout:.0f} s")
+            status, value = conn.recv()
+
+        if status == "ok":
+            return value
+        if status == "busy":
+            raise DaemonBusy(value)
+        if status == "timeout":
+            raise TimeoutError(value)
+        raise RuntimeError(f"inference daemon: {value}")
+
+    def stats(self) -> dict:
+        return self.request("stats")
+
+
+class RemoteWhisper:
+    """
+    Stands in for WhisperForConditionalGeneration: config and device are
+    local, generate() runs in the daemon. Feature extraction and decoding
+    of the ids stay with the caller's WhisperProcessor.
+    """
+
+    remote = True
+
+    def __init__(self, client: DaemonClient, model_id: str, fast_cpu: bool):
+        import torch
+        from transformers import AutoConfig
+
+        self.client = client
+        self.model_id = model_id
+        self.fast_cpu = fast_cpu
+        self.config = AutoConfig.from_pretrained(model_id)
+        self.device = torch.device("cpu")
+
+    def eval(self):
+        return self
+
+    def generate(self, input_features, **kwargs):
+        import torch
+
+        ids = self.client.request(
+            "generate",
+            model=self.model_id,
+            fast_cpu=self.fast_cpu,
+            inputs=input_features.cpu().numpy(),
+            kwargs=kwargs,
+        )
+        return torch.from_numpy(ids)
+
+
+class RemotePipeline:
+    """
+    Stands in for a transformers text pipeline. The tokenizer and config
+    are loaded locally (chunking and context sizes need them); calls run
+    in the daemon and return the pipeline's own output.
+    """
+
+    remote = True
+
+    def __init__(self, client: DaemonClient, task: str, model_id: str, fast_cpu: bool):
+        from transformers import AutoConfig, AutoTokenizer
+
+        self.client = client
+        self.task = task
+        self.model_id = model_id
+        self.fast_cpu = fast_cpu
+        self.tokenizer = AutoTokenizer.from_pretrained(model_id)
+        self.model = SimpleNamespace(config=AutoConfig.from_pretrained(model_id), name_or_path=model_id)
+
+    def __call__(self, inputs, batch_size: int = None, **kwargs):
+        # the daemon picks the batch size from everything it has queued
+        single = isinstance(inputs, str)
+        out = self.client.request(
+            "pipeline",
+            task=self.task,
+            model=self.model_id,
+            fast_cpu=self.fast_cpu,
+            inputs=[inputs] if single else list(inputs),
+            kwargs=kwargs,
+        )
+        return out[0] if single else out
+
+
+def remote_whisper(model_id: str, fast_cpu: bool = FAST_CPU, address: str = DAEMON):
+    """
+    (processor, model) for load_whisper when a daemon is configured.
+    """
+    from transformers import WhisperProcessor
+
+    client = DaemonClient(address)
+    client.request("ping")
+    return WhisperProcessor.from_pretrained(model_id), RemoteWhisper(client, model_id, fast_cpu)
+
+
+def remote_pipeline(task: str, model_id: str, fast_cpu: bool = FAST_CPU, address: str = DAEMON):
+    """
+    Pipeline stand-in for load_pipeline when a daemon is configured.
+    """
+    client = DaemonClient(address)
+    client.request("ping")
+    return RemotePipeline(client, task, model_id, fast_cpu)
+
+
+class _Request:
+    __slots__ = ("key", "msg", "size", "deadline", "done", "reply")
+
+    def __init__(self, msg: dict):
+        self.msg = msg
+        self.deadline = time.monotonic() + msg["timeout"]
+        self.done = threading.Event()
+        self.reply = None
+
+        # only requests with equal keys can share a forward pass
+        kwargs = repr(sorted(msg["kwargs"].items()))
+        self.size = len(msg["inputs"])
+        if msg["op"] == "generate":
+            self.key = ("generate", msg["model"], msg["fast_cpu"], msg["inputs"].shape[1:], kwargs)
+        else:
+            self.key = ("pipeline", msg["task"], msg["model"], msg["fast_cpu"], kwargs)
+
+    def answer(self, status: str, value=None):
+        self.reply = (status, value)
+        self.done.set()
+
+
+class InferenceServer:
+    """
+    Accepts connections on `address` and hands every request to a single
+    batching thread through a bounded queue, so one forward pass runs at a
+    time and gets all of the host's cores.
+
+    The batching thread takes the oldest request, then keeps collecting
+    requests for the same model and settings for `window_ms` (or until
+    `max_batch` inputs), and runs them as one call. Requests for other
+    models wait for the next round. A full queue is refused at once with
+    "busy"; a request still waiting when its timeout passes is answered
+    with "timeout" instead of being run.
+
+    Models are loaded on first request through a ModelPool, so
+    LETUNOTE_MODEL_BUDGET_MB applies to the daemon too.
+
+    Only loopback TCP addresses are accepted unless `allow_remote` is set.
+    """
+
+    def __init__(
+        self,
+        address: str = DAEMON,
+        authkey: bytes = None,
+        window_ms: float = DAEMON_WINDOW_MS,
+        max_batch: int = DAEMON_MAX_BATCH,
+        max_queue: int = DAEMON_QUEUE,
+        allow_remote: bool = DAEMON_ALLOW_REMOTE,
+    ):
+        self.address = parse_address(address)
+        if isinstance(self.address, tuple) and not allow_remote and not _is_loopback(self.address[0]):
+            raise ValueError(
+                f"refusing to listen on {self.address[0]}, which is not a loopback address; "
+                "set LETUNOTE_DAEMON_ALLOW_REMOTE=1 (or pass --allow-remote) to expose the daemon"
+            )
+        self.authkey = authkey or load_key(create=True)
+        self.window = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.max_queue = max(1, max_queue)
+        self.pool = ModelPool()
+
+        # every accepted request counts against max_queue until it is
+        # batched, including those set aside in _pending for another model
+        self._queue = queue.Queue()
+        self._waiting = 0
+        self._pending = deque()
+        self._registered = set()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._listener = None
+        self.counters = {"requests": 0, "batches": 0, "inputs": 0, "rejected": 0, "timed_out": 0}
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counters)
+        stats["occupancy"] = stats["inputs"] / max(stats["batches"], 1)
+        stats["queued"] = self._waiting
+        stats["models"] = self.pool.stats()
+        return stats
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+
+    def _model(self, key):
+        # one pool entry per model, whatever the input shape or settings
+        name = ":".join(str(part) for part in key[:3 if key[0] == "generate" else 4])
+        if name not in self._registered:
+            self._registered.add(name)
+            from utils.models import load_pipeline, load_whisper
+
+            if key[0] == "generate":
+                _, model_id, fast_cpu = key[:3]
+                self.pool.register(name, lambda: load_whisper(model_id, fast_cpu, daemon="")[1])
+            else:
+                _, task, model_id, fast_cpu = key[:4]
+                self.pool.register(name, lambda: load_pipeline(task, model_id, fast_cpu, daemon=""))
+        return self.pool.use(name)
+
+    def _run(self, batch: list) -> list:
+        first = batch[0].msg
+        if first["op"] == "generate":
+            import numpy as np
+            import torch
+
+            inputs = np.concatenate([r.msg["inputs"] for r in batch])
+            with self._model(batch[0].key) as model, torch.no_grad():
+                ids = model.generate(torch.from_numpy(inputs).to(model.device), **first["kwargs"])
+            ids = ids.cpu().numpy()
+        else:
+            inputs = [text for r in batch for text in r.msg["inputs"]]
+            with self._model(batch[0].key) as pipe:
+                ids = pipe(inputs, batch_size=len(inputs), **first["kwargs"])
+
+        # split the batched output back into each request's rows
+        bounds = list(itertools.accumulate([r.size for r in batch], initial=0))
+        return [ids[a:b] for a, b in zip(bounds, bounds[1:])]
+
+    def _next_batch(self):
+        if self._pending:
+            first = self._pending.popleft()
+        else:
+            first = None
+            while first is None:
+                if self._closed.is_set():
+                    return None
+                try:
+                    first = self._queue.get(timeout=0.2)
+                except queue.Empty:
+                    pass
+        batch, size = [first], first.size
+
+        # requests set aside by an earlier round come first
+        for req in list(self._pending):
+            if req.key == first.key and size + req.size <= self.max_batch:
+                self._pending.remove(req)
+                batch.append(req)
+                size += req.size
+
+        close = time.monotonic() + self.window
+        while size < self.max_batch:
+            remaining = close - time.monotonic()
+            try:
+                req = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if req.key == first.key and size + req.size <= self.max_batch:
+                batch.append(req)
+                size += req.size
+            else:
+                self._pending.append(req)
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            with self._lock:
+                self._waiting -= len(batch)
+
+            now = time.monotonic()
+            live = []
+            for req in batch:
+                if req.deadline <= now:
+                    self._count("timed_out")
+                    req.answer("timeout", "request waited longer than its timeout")
+                else:
+                    live.append(req)
+            if not live:
+                continue
+
+            try:
+                results = self._run(live)
+            except Exception as exc:
+                for req in live:
+                    req.answer("error", f"{type(exc).__name__}: {exc}")
+                continue
+
+            self._count("batches")
+            self._count("inputs", sum(r.size for r in live))
+            for req, result in zip(live, results):
+                req.answer("ok", result)
+
+    def _handle(self, conn):
+        with conn:
+            # authenticate here rather than in accept(), so a slow or
+            # silent client only holds up its own thread
+            try:
+                deliver_challenge(conn, self.authkey)
+                answer_challenge(conn, self.authkey)
+            except (OSError, EOFError, AuthenticationError):
+                return
+
+            while True:
+                try:
+                    msg = conn.recv()
+                except (EOFError, OSError):
+                    return
+
+                if msg["op"] == "ping":
+                    conn.send(("ok", "pong"))
+                    continue
+                if msg["op"] == "stats":
+                    conn.send(("ok", self.stats()))
+                    continue
+
+                self._count("requests")
+                try:
+                    req = _Request(msg)
+                except (KeyError, TypeError, AttributeError) as exc:
+                    conn.send(("error", f"malformed request: {exc}"))
+                    continue
+                with self._lock:
+                    full = self._waiting >= self.max_queue
+                    if full:
+                        self.counters["rejected"] += 1
+                    else:
+                        self._waiting += 1
+                if full:
+                    conn.send(("busy", f"queue full ({self.max_queue} requests)"))
+                    continue
+                self._queue.put(req)
+
+                req.done.wait()
+                try:
+                    conn.send(req.reply)
+                except OSError:
+                    return
+
+    def serve_forever(self):
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)  # stale socket from a previous run
+        self._listener = Listener(self.address)
+        worker = threading.Thread(target=self._work, name="letunote-daemon-batch", daemon=True)
+        worker.start()
+
+        try:
+            while not self._closed.is_set():
+                try:
+                    conn = self._listener.accept()
+                except OSError:
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            self._listener.close()
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.unlink(self.address)
+
+    def close(self):
+        """
+        Stop accepting connections and end the batching thread. Safe to
+        call from another thread while serve_forever() runs.
+        """
+        self._closed.set()
+        try:
+            # wake accept() so the loop sees the flag
+            Client(self.address, authkey=self.authkey).close()
+        except OSError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LetUNote shared inference daemon")
+    parser.add_argument("--address", default=DAEMON or "/tmp/letunote.sock",
+                        help="Unix socket path or host:port")
+    parser.add_argument("--window-ms", type=float, default=DAEMON_WINDOW_MS,
+                        help="how long to collect requests for one batch")
+    parser.add_argument("--max-batch", type=int, default=DAEMON_MAX_BATCH,
+                        help="inputs per forward pass")
+    parser.add_argument("--queue", type=int, default=DAEMON_QUEUE,
+                        help="queued requests before new ones are refused")
+    parser.add_argument("--allow-remote", action="store_true", default=DAEMON_ALLOW_REMOTE,
+                        help="allow a TCP address other than loopback")
+    args = parser.parse_args()
+
+    server = InferenceServer(args.address, window_ms=args.window_ms, max_batch=args.max_batch,
+                             max_queue=args.queue, allow_remote=args.allow_remote)
+    print(f"LetUNote inference daemon listening on {server.address}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# utils/export.py
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import chain
+from typing import NamedTuple
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from utils.metrics import stage
+
+
+class Layout(NamedTuple):
+    font: str
+    bold: str
+    size: int
+    title_size: int
+    leading: int
+    left: int
+    width: int
+    top: int
+    bottom: int
+    section_gap: int
+    paragraph_gap: int
+
+
+# Notes PDF offered by app.py
+NOTES = Layout("Times-Roman", "Times-Bold", 10, 14, 12, 40, 532, 750, 40, 15, 6)
+# Single-document PDF written by utils.helpers.create_pdf
+DOCUMENT = Layout("Helvetica", "Helvetica-Bold", 12, 16, 18, 100, 430, 750, 100, 8, 8)
+
+_MAX_MEMO = 32
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+@lru_cache(maxsize=65536)
+def _width(word: str, font: str, size: int) -> float:
+    return stringWidth(word, font, size)
+
+
+def wrap_lines(body: str, font: str, size: int, width: float):
+    """
+    Greedy word wrap of every line in `body` to `width` points, yielding
+    lines lazily. Word widths are cached, so each distinct word is measured
+    once. A blank line yields None (paragraph break).
+    """
+    space = _width(" ", font, size)
+
+    for raw in body.split("\n"):
+        words = raw.split()
+        if not words:
+            yield None
+            continue
+
+        line, used = [], 0.0
+        for word in words:
+            w = _width(word, font, size)
+            if w > width:
+                # a single word wider than the column: break it by characters
+                if line:
+                    yield " ".join(line)
+                    line, used = [], 0.0
+                part = ""
+                for ch in word:
+                    if part and _width(part + ch, font, size) > width:
+                        yield part
+                        part = ""
+                    part += ch
+                line, used = [part], _width(part, font, size)
+                continue
+
+            needed = w if not line else used + space + w
+            if needed > width:
+                yield " ".join(line)
+                line, used = [word], w
+            else:
+                line.append(word)
+                used = needed
+
+        if line:
+            yield " ".join(line)
+
+
+def render_pdf(sections, layout: Layout = NOTES, header: list = ()) -> bytes:
+    """
+    Render (title, body) sections to PDF bytes in memory.
+    Lines are wrapped lazily and each page is emitted as soon as it fills,
+    so long transcripts are never laid out in full up front.
+    `header` lines are drawn in the body font under the first title.
+    """
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=letter, pageCompression=0)
+    y = layout.top
+    text = None
+
+    def flush_page():
+        nonlocal text, y
+        if text is not None:
+            c.drawText(text)
+            text = None
+        c.showPage()
+        y = layout.top
+
+    def start_text():
+        nonlocal text
+        text = c.beginText(layout.left, y)
+        text.setFont(layout.font, layout.size, layout.leading)
+
+    for i, (title, body) in enumerate(sections):
+        if y - layout.title_size - layout.leading < layout.bottom:
+            flush_page()
+        if text is not None:
+            c.drawText(text)
+            text = None
+
+        c.setFont(layout.bold, layout.title_size)
+        c.drawString(layout.left, y, title)
+        y -= layout.title_size + 6
+
+        start_text()
+        lines = chain(header if i == 0 else (), wrap_lines(body, layout.font, layout.size, layout.width))
+        for line in lines:
+            if line is None:
+                y -= layout.paragraph_gap
+                text.setTextOrigin(layout.left, y)
+                continue
+            if y < layout.bottom:
+                flush_page()
+                start_text()
+            text.textLine(line)
+            y -= layout.leading
+
+        y -= layout.section_gap
+
+    if text is not None:
+        c.drawText(text)
+    c.save()
+    return buf.getvalue()
+
+
+def format_summary(summ: str) -> str:
+    bullet_summary = "### Summary\n"
+    for line in summ.split(". "):
+        if line.strip():
+            bullet_summary += f"- {line.strip()}\n"
+    return bullet_summary
+
+
+def format_questions(questions: list) -> str:
+    qs = "### ❓ Questions\n"
+    for q in questions:
+        qs += f"- {q}\n"
+    return qs
+
+
+def render_notes_pdf(transcript: str, summary: str, questions: str) -> bytes:
+    """
+    Notes PDF (summary, questions, transcript) as bytes.
+    Results are memoized by a hash of the three texts, so Streamlit
+    reruns such as tab switches reuse the bytes instead of re-rendering.
+    """
+    digest = hashlib.sha256()
+    for part in (transcript, summary, questions):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    key = digest.hexdigest()
+
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+
+    with stage("pdf", words=lambda: len(transcript.split())):
+        pdf = render_pdf([
+            ("SUMMARY", summary),
+            ("QUESTIONS", questions),
+            ("TRANSCRIPT", transcript),
+        ])
+
+    with _memo_lock:
+        _memo[key] = pdf
+        while len(_memo) > _MAX_MEMO:
+            _memo.popitem(last=False)
+    return pdf
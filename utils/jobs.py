@@ -0,0 +1,162 @@
+# utils/jobs.py
+import json
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.config import JOB_WORKERS, JOBS_DB
+
+ACTIVE = ("queued", "running")
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once cancellation has been requested."""
+
+
+class JobStore:
+    """
+    Job state and per-stage progress in a local SQLite file, so a browser
+    refresh (or a second session) can find a job again by its ID.
+    """
+
+    def __init__(self, path: str = JOBS_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    progress REAL DEFAULT 0,
+                    partial TEXT,
+                    options TEXT,
+                    result TEXT,
+                    error TEXT,
+                    cancel INTEGER DEFAULT 0,
+                    pid INTEGER,
+                    created REAL,
+                    updated REAL
+                )
+                """
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def create(self, options: dict) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, status, options, pid, created, updated) "
+                "VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, json.dumps(options), os.getpid(), now, now)
+            )
+        return job_id
+
+    def update(self, job_id: str, **fields) -> None:
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        fields["updated"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as db:
+            db.execute(
+                f"UPDATE jobs SET {columns} WHERE id = ?",
+                (*fields.values(), job_id)
+            )
+
+    def get(self, job_id: str):
+        with self._connect() as db:
+            db.row_factory = sqlite3.Row
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"] or "{}")
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def request_cancel(self, job_id: str) -> None:
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET cancel = 1, updated = ? WHERE id = ?",
+                (time.time(), job_id)
+            )
+
+    def is_cancelled(self, job_id: str) -> bool:
+        with self._connect() as db:
+            row = db.execute("SELECT cancel FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def fail_orphans(self) -> None:
+        """
+        Mark jobs whose server process has exited as failed, since
+        their worker threads died with it.
+        """
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT id, pid FROM jobs WHERE status IN (?, ?)", ACTIVE
+            ).fetchall()
+        for job_id, pid in rows:
+            if pid != os.getpid() and not _alive(pid):
+                self.update(job_id, status="failed", error="Server restarted before the job finished.")
+
+
+def _alive(pid) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, TypeError):
+        return pid is not None
+    return True
+
+
+class JobQueue:
+    """
+    Runs `runner(audio, options, progress)` on a pool of worker threads.
+    The runner reports progress with progress(stage, fraction, partial=None),
+    which raises JobCancelled once the job has been cancelled.
+    """
+
+    def __init__(self, runner, store: JobStore = None, workers: int = JOB_WORKERS):
+        self.runner = runner
+        self.store = store or JobStore()
+        self.store.fail_orphans()
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="letunote-job")
+
+    def submit(self, audio, options: dict) -> str:
+        job_id = self.store.create(options)
+        self.pool.submit(self._run, job_id, audio, options)
+        return job_id
+
+    def get(self, job_id: str):
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> None:
+        self.store.request_cancel(job_id)
+
+    def _run(self, job_id: str, audio, options: dict) -> None:
+        def progress(stage, fraction, partial=None):
+            if self.store.is_cancelled(job_id):
+                raise JobCancelled(job_id)
+            fields = {"stage": stage, "progress": float(fraction)}
+            if partial is not None:
+                fields["partial"] = partial
+            self.store.update(job_id, **fields)
+
+        try:
+            progress("starting", 0.0)
+            self.store.update(job_id, status="running")
+            result = self.runner(audio, options, progress)
+        except JobCancelled:
+            self.store.update(job_id, status="cancelled")
+        except Exception as exc:
+            self.store.update(job_id, status="failed", error=str(exc))
+        else:
+            self.store.update(job_id, status="done", stage="done", progress=1.0, result=result)
@@ -0,0 +1,73 @@
+# utils/journal.py
+import json
+import os
+
+from utils.config import JOURNAL_DIR
+
+
+class TranscriptJournal:
+    """
+    Append-only record of decoded transcription windows for one recording,
+    so a failed or interrupted run can resume after the last window it
+    finished instead of starting from zero.
+
+    One JSON line per window: {"i": index, "start", "end", "text"}, where
+    text is what the window contributed after stitching ("" if nothing).
+    Each line is flushed and fsynced before the next window is decoded.
+    A torn last line from a crash is cut off on load.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @classmethod
+    def for_key(cls, key: str, root: str = JOURNAL_DIR) -> "TranscriptJournal":
+        """
+        Journal for a cache key that covers the audio hash, model and
+        transcription parameters (see utils.cache.make_key).
+        """
+        return cls(os.path.join(root, f"{key}.jsonl"))
+
+    def load(self) -> list:
+        """
+        Records already journaled, in window order. Anything after the
+        first unreadable or out-of-order line is discarded.
+        """
+        records = []
+        good = 0
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    if not line.endswith(b"\n") or record.get("i") != len(records):
+                        break
+                    records.append(record)
+                    good += len(line)
+        except FileNotFoundError:
+            return []
+
+        if good < os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+        return records
+
+    def append(self, index: int, start: float, end: float, text: str) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        line = json.dumps({"i": index, "start": start, "end": end, "text": text})
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def complete(self) -> None:
+        """
+        Drop the journal once its transcript has been stored elsewhere
+        (the result cache, or the CLI's transcript.txt).
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
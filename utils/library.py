@@ -0,0 +1,273 @@
+# utils/library.py
+import os
+import re
+import shutil
+import sqlite3
+import time
+from collections import Counter
+
+from utils.config import LIBRARY_AUDIO_DIR, LIBRARY_AUDIO_MAX_MB, LIBRARY_DB
+
+_TOKEN = re.compile(r"\w+(?:'\w+)?")
+_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text: str) -> list:
+    return [t.lower() for t in _TOKEN.findall(text)]
+
+
+def parse_query(query: str):
+    """
+    Split a query into (phrase, [(term, is_prefix), ...]).
+    A query wrapped in double quotes is a phrase; otherwise every term
+    must occur in the same segment. A trailing * makes a term a prefix.
+    """
+    match = _QUERY.fullmatch(query.strip())
+    phrase = bool(match and match.group(1) is not None)
+    body = match.group(1) if phrase else query
+
+    terms = []
+    for word in body.split():
+        prefix = word.endswith("*")
+        tokens = tokenize(word)
+        for i, token in enumerate(tokens):
+            terms.append((token, prefix and i == len(tokens) - 1))
+    return phrase, terms
+
+
+class LectureLibrary:
+    """
+    Timestamped transcript segments for every processed lecture, with an
+    inverted index from each token to its (lecture, segment, word offset).
+
+    Postings are keyed (term, lecture, offset), so phrase matches are point
+    lookups at offset + 1, and prefix terms are a range scan over the
+    sorted vocabulary. Queries never read segment text except for the
+    hits they return. Lectures are indexed once, when added.
+
+    Audio copies are kept only while they fit in `audio_max_mb` (0 keeps
+    none); the oldest are deleted first, and their lectures stay
+    searchable without playback.
+    """
+
+    def __init__(
+        self,
+        path: str = LIBRARY_DB,
+        audio_dir: str = LIBRARY_AUDIO_DIR,
+        audio_max_mb: int = LIBRARY_AUDIO_MAX_MB,
+    ):
+        self.path = path
+        self.audio_dir = audio_dir
+        self.audio_max_bytes = audio_max_mb * 1024 * 1024
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS lectures (
+                    id INTEGER PRIMARY KEY,
+                    key TEXT UNIQUE NOT NULL,
+                    name TEXT,
+                    duration REAL,
+                    audio TEXT,
+                    created REAL
+                );
+                CREATE TABLE IF NOT EXISTS segments (
+                    lecture INTEGER NOT NULL,
+                    seq INTEGER NOT NULL,
+                    start REAL,
+                    end REAL,
+                    first_pos INTEGER,
+                    words INTEGER,
+                    text TEXT,
+                    PRIMARY KEY (lecture, seq)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS terms (
+                    id INTEGER PRIMARY KEY,
+                    term TEXT UNIQUE NOT NULL,
+                    df INTEGER DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS postings (
+                    term INTEGER NOT NULL,
+                    lecture INTEGER NOT NULL,
+                    pos INTEGER NOT NULL,
+                    seq INTEGER NOT NULL,
+                    PRIMARY KEY (term, lecture, pos)
+                ) WITHOUT ROWID;
+                """
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def has(self, key: str) -> bool:
+        with self._connect() as db:
+            return db.execute("SELECT 1 FROM lectures WHERE key = ?", (key,)).fetchone() is not None
+
+    def add(self, key: str, name: str, pieces, duration: float = 0.0, audio=None) -> int:
+        """
+        Store a lecture's segments (TranscriptPiece-like: start, end, text)
+        and index them. `key` identifies the recording (e.g. the transcript
+        cache key); adding the same key again is a no-op. `audio`, an open
+        binary file, is copied into the library for playback when audio
+        copies are enabled.
+        """
+        with self._connect() as db:
+            row = db.execute("SELECT id FROM lectures WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                return row[0]
+
+            audio_path = None
+            if audio is not None and self.audio_max_bytes > 0:
+                pos = audio.tell()
+                # a recording bigger than the whole budget is never copied
+                if audio.seek(0, os.SEEK_END) <= self.audio_max_bytes:
+                    ext = os.path.splitext(name)[1] or ".audio"
+                    audio_path = os.path.join(self.audio_dir, f"{key}{ext}")
+                    os.makedirs(self.audio_dir, exist_ok=True)
+                    audio.seek(0)
+                    with open(audio_path, "wb") as f:
+                        shutil.copyfileobj(audio, f)
+                audio.seek(pos)
+
+            lecture = db.execute(
+                "INSERT INTO lectures (key, name, duration, audio, created) VALUES (?, ?, ?, ?, ?)",
+                (key, name, duration, audio_path, time.time())
+            ).lastrowid
+
+            segments, postings, df = [], [], Counter()
+            offset = 0
+            for seq, piece in enumerate(pieces):
+                tokens = tokenize(piece.text)
+                segments.append((lecture, seq, piece.start, piece.end, offset, len(tokens), piece.text))
+                postings.extend((token, lecture, offset + i, seq) for i, token in enumerate(tokens))
+                df.update(set(tokens))
+                offset += len(tokens)
+
+            if audio_path is not None:
+                self._evict_audio(db)
+
+            db.executemany("INSERT INTO segments VALUES (?, ?, ?, ?, ?, ?, ?)", segments)
+            db.executemany(
+                "INSERT INTO terms (term, df) VALUES (?, ?) "
+                "ON CONFLICT(term) DO UPDATE SET df = df + excluded.df",
+                df.items()
+            )
+            db.executemany(
+                "INSERT OR IGNORE INTO postings (term, lecture, pos, seq) "
+                "SELECT id, ?, ?, ? FROM terms WHERE term = ?",
+                ((lec, pos, seq, token) for token, lec, pos, seq in postings)
+            )
+            return lecture
+
+    def _evict_audio(self, db) -> None:
+        """
+        Delete the oldest audio copies until the rest fit the budget.
+        """
+        total = 0
+        rows = db.execute(
+            "SELECT id, audio FROM lectures WHERE audio IS NOT NULL ORDER BY created DESC, id DESC"
+        ).fetchall()
+        for lecture, path in rows:
+            size = os.path.getsize(path) if os.path.exists(path) else None
+            if size is not None and total + size <= self.audio_max_bytes:
+                total += size
+                continue
+            if size is not None:
+                os.remove(path)
+            db.execute("UPDATE lectures SET audio = NULL WHERE id = ?", (lecture,))
+
+    @staticmethod
+    def _term_filter(column: str, term: str, prefix: bool):
+        if prefix:
+            # every vocabulary entry in [term, term + U+10FFFF) starts with term
+            return (f"{column} IN (SELECT id FROM terms WHERE term >= ? AND term < ?)",
+                    [term, term + "\U0010ffff"])
+        return f"{column} = (SELECT id FROM terms WHERE term = ?)", [term]
+
+    def _frequency(self, db, term: str, prefix: bool) -> int:
+        if prefix:
+            row = db.execute(
+                "SELECT SUM(df) FROM terms WHERE term >= ? AND term < ?", (term, term + "\U0010ffff")
+            ).fetchone()
+        else:
+            row = db.execute("SELECT df FROM terms WHERE term = ?", (term,)).fetchone()
+        return (row[0] or 0) if row else 0
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """
+        Segments matching `query`, as dicts with the lecture name, start
+        and end seconds, text and stored audio path. See parse_query for
+        the syntax.
+        """
+        phrase, terms = parse_query(query)
+        if not terms:
+            return []
+
+        with self._connect() as db:
+            freq = [self._frequency(db, t, p) for t, p in terms]
+            if not all(freq):
+                return []
+
+            if phrase:
+                # scan the rarest word; every other word is a point lookup
+                # at its offset relative to it
+                k = freq.index(min(freq))
+                joins, params = [], []
+                for i, (term, prefix) in enumerate(terms):
+                    if i == k:
+                        continue
+                    cond, extra = self._term_filter(f"p{i}.term", term, prefix)
+                    joins.append(
+                        f"CROSS JOIN postings p{i} ON p{i}.lecture = a.lecture "
+                        f"AND p{i}.pos = a.pos + {i - k} AND {cond}"
+                    )
+                    params += extra
+                where, extra = self._term_filter("a.term", *terms[k])
+                params += extra
+                # report the segment where the phrase starts
+                first = "a" if k == 0 else "p0"
+                sql = (
+                    f"SELECT DISTINCT {first}.lecture, {first}.seq FROM postings a "
+                    + " ".join(joins) + f" WHERE {where} LIMIT ?"
+                )
+            else:
+                # rarest term drives the scan; the others are probed
+                # within each candidate segment's word range
+                terms = [t for _, t in sorted(zip(freq, terms), key=lambda x: x[0])]
+                where, params = self._term_filter("p0.term", *terms[0])
+                for term, prefix in terms[1:]:
+                    cond, extra = self._term_filter("q.term", term, prefix)
+                    where += (
+                        f" AND EXISTS (SELECT 1 FROM postings q WHERE {cond} "
+                        "AND q.lecture = p0.lecture "
+                        "AND q.pos >= s.first_pos AND q.pos < s.first_pos + s.words)"
+                    )
+                    params = params + extra
+                sql = (
+                    "SELECT DISTINCT p0.lecture, p0.seq FROM postings p0 "
+                    "JOIN segments s ON s.lecture = p0.lecture AND s.seq = p0.seq "
+                    f"WHERE {where} LIMIT ?"
+                )
+
+            hits = db.execute(sql, params + [limit]).fetchall()
+
+            db.row_factory = sqlite3.Row
+            results = []
+            for lecture, seq in hits:
+                row = db.execute(
+                    "SELECT l.name, l.audio, l.key, s.start, s.end, s.text "
+                    "FROM segments s JOIN lectures l ON l.id = s.lecture "
+                    "WHERE s.lecture = ? AND s.seq = ?",
+                    (lecture, seq)
+                ).fetchone()
+                results.append(dict(row))
+        return results
+
+    def stats(self) -> dict:
+        with self._connect() as db:
+            lectures, hours = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(duration), 0) / 3600 FROM lectures"
+            ).fetchone()
+            segments = db.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        return {"lectures": lectures, "hours": hours, "segments": segments}
@@ -0,0 +1,194 @@
+# utils/metrics.py
+import contextvars
+import functools
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+
+from utils.config import METRICS, METRICS_DIR
+from utils.registry import current_rss
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_run = contextvars.ContextVar("letunote_run", default=(None, None))
+_lock = threading.Lock()
+_totals = {}  # stage -> [count, wall_s, cpu_s, audio_s]
+
+
+def _peak_rss() -> int:
+    """
+    High-water mark of resident memory in bytes; falls back to the
+    current RSS where getrusage is unavailable.
+    """
+    if resource is None:
+        return current_rss()
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _write_atomic(path: str, text: str) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _instance() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _prometheus(instance: str) -> str:
+    lines = []
+    for metric, col, kind, help_text in [
+        ("letunote_stage_runs_total", 0, "counter", "Times each stage ran"),
+        ("letunote_stage_seconds_total", 1, "counter", "Wall-clock seconds spent in each stage"),
+        ("letunote_stage_cpu_seconds_total", 2, "counter", "Process CPU seconds spent in each stage"),
+        ("letunote_stage_audio_seconds_total", 3, "counter", "Audio seconds processed by each stage"),
+    ]:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, values in sorted(_totals.items()):
+            lines.append(f'{metric}{{stage="{name}",instance="{instance}"}} {values[col]:.6g}')
+    return "\n".join(lines) + "\n"
+
+
+def record(entry: dict, root: str = METRICS_DIR) -> None:
+    """
+    Append one stage measurement to metrics.jsonl and refresh this
+    process's Prometheus textfile with its running totals. Every process
+    (app replicas, CLI workers) writes its own letunote-<host>-<pid>.prom
+    with an `instance` label, since the totals are per process; sum over
+    `instance` for host-wide figures.
+    """
+    os.makedirs(root, exist_ok=True)
+    line = json.dumps(entry)
+    with _lock:
+        with open(os.path.join(root, "metrics.jsonl"), "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+        totals = _totals.setdefault(entry["stage"], [0, 0.0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += entry["wall_s"]
+        totals[2] += entry["cpu_s"]
+        totals[3] += entry.get("audio_s", 0.0)
+        instance = _instance()
+        _write_atomic(os.path.join(root, f"letunote-{instance}.prom"), _prometheus(instance))
+
+
+@contextmanager
+def _measure(name: str, sizes: dict):
+    run_id, label = _run.get()
+    rss = _peak_rss()
+    cpu = time.process_time()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - start
+        entry = {
+            "time": time.time(),
+            "run": run_id,
+            "label": label,
+            "stage": name,
+            "wall_s": round(wall, 6),
+            # process-wide, so it includes torch's intra-op threads
+            "cpu_s": round(time.process_time() - cpu, 6),
+            "peak_rss_mb": round(max(0, _peak_rss() - rss) / (1024 * 1024), 1),
+        }
+        for key, value in sizes.items():
+            if callable(value):
+                try:
+                    value = value()
+                except Exception:
+                    value = None  # the block failed before its input was known
+            entry[key] = value
+        if entry.get("audio_s"):
+            entry["rtf"] = round(wall / entry["audio_s"], 4)
+        record(entry)
+
+
+def stage(name: str, **sizes):
+    """
+    Time a block as one pipeline stage:
+
+        with stage("whisper", audio_s=duration):
+            ...
+
+    `sizes` describe the input (audio_s, tokens, words, ...). Callables
+    are evaluated after the block, and only when metrics are on, so they
+    can refer to values the block computes. With LETUNOTE_METRICS unset
+    this returns a shared no-op context manager.
+    """
+    if not METRICS:
+        return _NOOP
+    return _measure(name, sizes)
+
+
+_NOOP = nullcontext()
+
+
+def timed(name: str):
+    """
+    Decorator form of `stage` for functions that are a stage on their own.
+    """
+    def wrap(fn):
+        if not METRICS:
+            return fn
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with _measure(name, {}):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+@contextmanager
+def run(label: str = ""):
+    """
+    Group the stages recorded inside this block (and in threads started
+    with a copy of its context) under one run id.
+    """
+    token = _run.set((uuid.uuid4().hex[:8], label))
+    try:
+        yield
+    finally:
+        _run.reset(token)
+
+
+def recent_runs(n: int, root: str = METRICS_DIR, tail_bytes: int = 256 * 1024) -> list:
+    """
+    The last `n` runs from metrics.jsonl, newest first, as
+    (run_id, label, [stage entries]) tuples. Only the end of the file is read.
+    """
+    path = os.path.join(root, "metrics.jsonl")
+    try:
+        with open(path, "rb") as f:
+            f.seek(max(0, os.path.getsize(path) - tail_bytes))
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+
+    runs = {}
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue  # partial first line of the tail
+        if entry.get("run") is None:
+            continue
+        runs.setdefault(entry["run"], (entry["run"], entry.get("label", ""), []))[2].append(entry)
+
+    return list(reversed(list(runs.values())))[:n]
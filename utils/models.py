@@ -1,77 +1,289 @@
 # utils/models.py
-import torch
-import librosa
-from transformers import (
-    WhisperProcessor,
-    WhisperForConditionalGeneration,
-    pipeline,
-)
+import re
+from itertools import islice
+from typing import NamedTuple
+
+import numpy as np
+
+from utils.audio import TARGET_SR, load_audio, stream_audio
+from utils.batching import BatchDecoder
+from utils.config import DAEMON, FAST_CPU, VAD
+from utils.journal import TranscriptJournal
+from utils.metrics import timed
+from utils.quantize import configure_threads, load_quantized
+from utils.questions import generate_question_list
+from utils.registry import ModelPool
+from utils.summarize import summarize_long
+from utils.vad import detect_speech
+
+
+def _device():
+    import torch
+
+    # Select device (CPU on Streamlit Cloud)
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+
+@timed("load whisper")
+def load_whisper(model_id: str, fast_cpu: bool = FAST_CPU, daemon: str = DAEMON):
+    """
+    Load a Whisper processor and model.
+    transformers and torch are imported here rather than at module level,
+    so importing utils.models (and painting the UI) stays fast.
+    With `fast_cpu` the model is int8-quantized and kept on the CPU.
+    With `daemon` (see utils.daemon) only the processor is loaded here and
+    generate() runs in the shared inference process.
+    """
+    if daemon:
+        from utils.daemon import remote_whisper
+
+        return remote_whisper(model_id, fast_cpu, daemon)
+
+    from transformers import WhisperForConditionalGeneration, WhisperProcessor
 
-# Select device (CPU on Streamlit Cloud)
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    configure_threads()
+    processor = WhisperProcessor.from_pretrained(model_id)
+
+    if fast_cpu:
+        asr_model = load_quantized(
+            model_id,
+            lambda: WhisperForConditionalGeneration.from_pretrained(model_id)
+        )
+    else:
+        asr_model = WhisperForConditionalGeneration.from_pretrained(model_id).to(_device())
+    asr_model.eval()
+    return processor, asr_model
 
-# Global cached models
-_processor = None
-_asr_model = None
-_summarizer = None
+
+@timed("load pipeline")
+def load_pipeline(task: str, model_id: str, fast_cpu: bool = FAST_CPU, daemon: str = DAEMON):
+    """
+    Load a text pipeline (summarization / question generation).
+    With `fast_cpu` the seq2seq model is int8-quantized.
+    With `daemon` the returned stand-in runs its calls in the shared
+    inference process.
+    """
+    if daemon:
+        from utils.daemon import remote_pipeline
+
+        return remote_pipeline(task, model_id, fast_cpu, daemon)
+
+    from transformers import pipeline
+
+    configure_threads()
+    if not fast_cpu:
+        return pipeline(task, model=model_id)
+
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+    model = load_quantized(
+        model_id,
+        lambda: AutoModelForSeq2SeqLM.from_pretrained(model_id)
+    )
+    return pipeline(task, model=model, tokenizer=AutoTokenizer.from_pretrained(model_id))
+
+
+ASR_MODEL = "openai/whisper-small"
+SUMMARY_MODEL = "sshleifer/distilbart-cnn-12-6"
+QG_MODEL = "valhalla/t5-small-qg-hl"
+
+ASR_PARAMS = {"window_s": 30.0, "overlap_s": 5.0, "vad": VAD}
+
+# Models are only loaded when their stage first runs
+models = ModelPool()
+models.register("asr", lambda: load_whisper(ASR_MODEL))
+models.register(
+    "summarizer",
+    lambda: load_pipeline("summarization", SUMMARY_MODEL)
+)
+models.register(
+    "qg",
+    lambda: load_pipeline("text2text-generation", QG_MODEL)
+)
 
 
 def load_models():
     """
-    Load and cache AI models to avoid reloading on every request.
+    Load AI models up front for callers that want them all at once.
     Models used:
     - Whisper (speech-to-text)
     - DistilBART (text summarization)
     """
-    global _processor, _asr_model, _summarizer
+    processor, asr_model = models.get("asr")
+    return processor, asr_model, models.get("summarizer")
 
-    if _processor is None or _asr_model is None or _summarizer is None:
-        _processor = WhisperProcessor.from_pretrained("openai/whisper-small")
-        _asr_model = WhisperForConditionalGeneration.from_pretrained(
-            "openai/whisper-small"
-        ).to(device)
 
-        _summarizer = pipeline(
-            "summarization",
-            model="sshleifer/distilbart-cnn-12-6"
-        )
+def load_question_generator():
+    """
+    Load the T5 question generator (valhalla/t5-small-qg-hl).
+    """
+    return models.get("qg")
 
-    return _processor, _asr_model, _summarizer
 
+class TranscriptPiece(NamedTuple):
+    start: float
+    end: float
+    text: str
 
-def transcribe_audio(audio_path: str) -> str:
+
+def _iter_windows(blocks, window_s: float, overlap_s: float, sr: int = TARGET_SR):
     """
-    Convert lecture audio file into text using Whisper.
+    Regroup a stream of audio blocks into fixed windows that overlap by
+    `overlap_s` seconds. Yields (offset_seconds, samples).
+    """
+    size = int(window_s * sr)
+    hop = size - int(overlap_s * sr)
+    buf = np.empty(size, dtype=np.float32)
+    filled = 0
+    fresh = 0
+    offset = 0
+
+    for block in blocks:
+        pos = 0
+        while pos < block.size:
+            take = min(size - filled, block.size - pos)
+            buf[filled:filled + take] = block[pos:pos + take]
+            filled += take
+            fresh += take
+            pos += take
+
+            if filled == size:
+                yield offset / sr, buf.copy()
+                buf[:size - hop] = buf[hop:]
+                filled = size - hop
+                fresh = 0
+                offset += hop
+
+    if fresh:
+        yield offset / sr, buf[:filled].copy()
+
+
+def _norm_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def _stitch(previous: list, text: str, max_overlap: int = 30) -> str:
+    """
+    Drop the leading words of `text` that repeat the tail of the previous
+    window, since overlapping windows transcribe the same speech twice.
+    """
+    words = text.split()
+    tail = [_norm_word(w) for w in previous[-max_overlap:]]
+    head = [_norm_word(w) for w in words[:max_overlap]]
+
+    for k in range(min(len(tail), len(head)), 0, -1):
+        if tail[-k:] == head[:k]:
+            return " ".join(words[k:])
+    return text
+
+
+def stream_transcribe(
+    audio,
+    window_s: float = 30.0,
+    overlap_s: float = 5.0,
+    processor=None,
+    asr_model=None,
+    vad: bool = VAD,
+    decoder: BatchDecoder = None,
+    journal: TranscriptJournal = None,
+):
     """
-    processor, asr_model, _ = load_models()
+    Transcribe a lecture window by window, yielding each newly decoded
+    piece of text as soon as Whisper finishes it.
+    `audio` is a path, a file object, or mono float32 samples at 16 kHz
+    (see utils.audio.load_audio). Paths and file objects are read and
+    resampled in blocks, so peak memory does not grow with the length
+    of the recording.
+    With `vad`, the audio is decoded up front and only the speech segments
+    found by utils.vad.detect_speech go to Whisper, one segment per window,
+    so silent stretches are never transcribed.
+    Windows are decoded in batches by `decoder` (a BatchDecoder over the
+    given model by default); its `throughput` reports audio seconds
+    transcribed per wall-clock second.
+    With a `journal`, every decoded window is checkpointed. A rerun on the
+    same journal replays the finished windows and resumes Whisper at the
+    first window that is not in it.
+    """
+    if processor is None or asr_model is None:
+        with models.use("asr") as (processor, asr_model):
+            yield from stream_transcribe(
+                audio, window_s, overlap_s, processor, asr_model, vad, decoder, journal
+            )
+        return
+
+    if decoder is None:
+        decoder = BatchDecoder(processor, asr_model)
+
+    done = journal.load() if journal is not None else []
+    words = []
+    for record in done:
+        if record["text"]:
+            words = (words + record["text"].split())[-30:]
+            yield TranscriptPiece(record["start"], record["end"], record["text"])
+
+    if vad:
+        samples = audio if isinstance(audio, np.ndarray) else load_audio(audio)
+        windows = (
+            (seg.start, seg.end, samples[int(seg.start * TARGET_SR):int(seg.end * TARGET_SR)])
+            for seg in detect_speech(samples, max_segment_s=window_s)
+        )
+    else:
+        if isinstance(audio, np.ndarray):
+            step = int(window_s * TARGET_SR)
+            blocks = (audio[i:i + step] for i in range(0, audio.size, step))
+        else:
+            blocks = stream_audio(audio)
 
-    speech, _ = librosa.load(audio_path, sr=16000)
-    inputs = processor(
-        speech,
-        sampling_rate=16000,
-        return_tensors="pt"
-    ).to(device)
+        windows = (
+            (offset, offset + window.size / TARGET_SR, window)
+            for offset, window in _iter_windows(blocks, window_s, overlap_s)
+        )
 
-    with torch.no_grad():
-        predicted_ids = asr_model.generate(**inputs)
+    index = len(done)
+    for start, end, text in decoder.stream(islice(windows, index, None)):
+        # VAD segments do not overlap, so only fixed windows need stitching
+        if not vad:
+            text = _stitch(words, text)
+        if journal is not None:
+            journal.append(index, start, end, text)
+        index += 1
 
-    transcript = processor.batch_decode(
-        predicted_ids,
-        skip_special_tokens=True
-    )[0]
+        if not text:
+            continue
 
-    return transcript
+        words = (words + text.split())[-30:]
+        yield TranscriptPiece(start, end, text)
 
 
+@timed("transcribe")
+def transcribe_audio(audio_path: str, journal: TranscriptJournal = None) -> str:
+    """
+    Convert lecture audio file into text using Whisper.
+    """
+    return " ".join(
+        piece.text for piece in stream_transcribe(audio_path, journal=journal, **ASR_PARAMS)
+    )
+
+
+@timed("summarize")
 def summarize_text(text: str) -> str:
     """
     Generate a concise summary from lecture transcript.
     """
-    _, _, summarizer = load_models()
+    with models.use("summarizer") as summarizer:
+        return summarize_long(
+            text,
+            summarizer,
+            max_length=300,
+            min_length=50,
+            do_sample=False
+        )
 
-    return summarizer(
-        text,
-        max_length=300,
-        min_length=50,
-        do_sample=False
-    )[0]["summary_text"]
+
+@timed("questions")
+def generate_questions(text: str, max_questions: int = 10) -> list:
+    """
+    Generate exam-style questions from the whole lecture transcript.
+    """
+    with models.use("qg") as qg:
+        return generate_question_list(text, qg, max_questions=max_questions)
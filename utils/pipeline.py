@@ -0,0 +1,195 @@
+# utils/pipeline.py
+import contextvars
+import copy
+import queue
+import threading
+
+from utils.config import PIPELINE_QUEUE_SIZE, QG_MAX_QUESTIONS, QG_PER_CHUNK, SUMMARY_BATCH_SIZE
+from utils.metrics import stage
+from utils.questions import build_inputs, dedupe_questions, run_prompts, spread
+from utils.summarize import chunk_text, context_window, summarize_chunks, summarize_long
+from utils.text import StreamCleaner
+
+_DONE = object()
+
+
+class _Stopped(Exception):
+    """Another stage failed or the caller gave up; unwind quietly."""
+
+
+def _put(q, item, stop):
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+    raise _Stopped()
+
+
+def _get(q, stop):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    raise _Stopped()
+
+
+class _Stage(threading.Thread):
+    def __init__(self, name, target, stop):
+        super().__init__(name=f"letunote-{name}", daemon=True)
+        self.target = target
+        self.stop = stop
+        self.error = None
+        # carry the caller's metrics run into this thread
+        self.context = contextvars.copy_context()
+
+    def run(self):
+        try:
+            self.context.run(self.target)
+        except BaseException as exc:
+            self.error = exc
+            self.stop.set()
+
+
+def run_pipelined(
+    pieces,
+    summarizer,
+    qg,
+    summary_params: dict,
+    max_questions: int = QG_MAX_QUESTIONS,
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+    batch_size: int = SUMMARY_BATCH_SIZE,
+    per_chunk: int = QG_PER_CHUNK,
+):
+    """
+    Clean, summarize and generate questions while transcription runs.
+
+    `pieces` yields raw transcript text (e.g. from stream_transcribe) and is
+    consumed on the calling thread, so it can report progress or raise to
+    cancel. Cleaned sentences are packed into summarizer-sized chunks, and
+    each chunk is summarized and turned into questions on its own worker
+    thread as soon as it is complete; if that leaves fewer than
+    `max_questions`, more prompts from the whole transcript follow. Bounded queues between the stages
+    stop ASR from running far ahead of the slower stages. Once the last
+    chunk lands, the chunk summaries are reduced to one summary.
+
+    Returns (transcript, summary, questions).
+    """
+    stop = threading.Event()
+    text_q = queue.Queue(queue_size)
+    summary_q = queue.Queue(queue_size)
+    qg_q = queue.Queue(queue_size)
+
+    sentences, partials, questions = [], [], []
+    # A fast tokenizer cannot be used from two threads at once (its
+    # truncation settings are mutable), so chunking gets its own copy
+    tokenizer = copy.deepcopy(summarizer.tokenizer)
+    window = context_window(summarizer)
+
+    def clean_and_chunk():
+        cleaner = StreamCleaner()
+        current, size = [], 0
+
+        def emit(chunk):
+            _put(summary_q, chunk, stop)
+            _put(qg_q, chunk, stop)
+
+        while True:
+            item = _get(text_q, stop)
+            new = cleaner.flush() if item is _DONE else cleaner.feed(item)
+            sentences.extend(new)
+
+            if new:
+                for sentence, ids in zip(new, tokenizer(new, add_special_tokens=False)["input_ids"]):
+                    if current and size + len(ids) > window:
+                        emit(" ".join(current))
+                        current, size = [], 0
+                    if len(ids) > window:
+                        for piece in chunk_text(sentence, tokenizer, window):
+                            emit(piece)
+                        continue
+                    current.append(sentence)
+                    size += len(ids)
+
+            if item is _DONE:
+                if current:
+                    emit(" ".join(current))
+                _put(summary_q, _DONE, stop)
+                _put(qg_q, _DONE, stop)
+                return
+
+    def summarize():
+        while True:
+            # Summarize whatever chunks are already waiting in one batch
+            batch = [_get(summary_q, stop)]
+            while batch[-1] is not _DONE and len(batch) < batch_size:
+                try:
+                    batch.append(summary_q.get_nowait())
+                except queue.Empty:
+                    break
+
+            chunks = [c for c in batch if c is not _DONE]
+            if chunks:
+                with stage("summarize chunks", chunks=len(chunks)):
+                    partials.extend(summarize_chunks(
+                        chunks, summarizer, summary_params, batch_size=len(chunks), workers=1
+                    ))
+            if batch[-1] is _DONE:
+                return
+
+    def ask():
+        asked = set()
+        while True:
+            chunk = _get(qg_q, stop)
+            if chunk is _DONE:
+                break
+            inputs = build_inputs(chunk, per_chunk)
+            asked.update(inputs)
+            with stage("questions", words=len(chunk.split())):
+                questions.extend(run_prompts(inputs, qg))
+
+        # A short lecture is only a chunk or two, so `per_chunk` prompts each
+        # fall short of `max_questions`. Top up from the whole transcript
+        # (all sentences are in by now), oversampled as generate_question_list does.
+        if len(dedupe_questions(questions)) < max_questions:
+            inputs = [p for p in build_inputs(" ".join(sentences), max_questions * 2) if p not in asked]
+            if inputs:
+                with stage("questions top-up", prompts=len(inputs)):
+                    questions.extend(run_prompts(inputs, qg))
+
+    workers = [
+        _Stage("clean", clean_and_chunk, stop),
+        _Stage("summarize", summarize, stop),
+        _Stage("questions", ask, stop),
+    ]
+    for worker in workers:
+        worker.start()
+
+    try:
+        try:
+            for text in pieces:
+                _put(text_q, text, stop)
+            _put(text_q, _DONE, stop)
+        except _Stopped:
+            pass
+        for worker in workers:
+            worker.join()
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+    for worker in workers:
+        if worker.error is not None and not isinstance(worker.error, _Stopped):
+            raise worker.error
+
+    # Reduce: a single chunk's summary is already final
+    if len(partials) > 1:
+        with stage("summarize reduce", chunks=len(partials)):
+            summary = summarize_long(" ".join(partials), summarizer, **summary_params)
+    else:
+        summary = partials[0] if partials else ""
+
+    return " ".join(sentences), summary, spread(dedupe_questions(questions), max_questions)
@@ -0,0 +1,73 @@
+# utils/quantize.py
+import os
+import tempfile
+
+from utils.config import QUANT_DIR, TORCH_INTEROP_THREADS, TORCH_THREADS
+
+
+def configure_threads(intra: int = TORCH_THREADS, inter: int = TORCH_INTEROP_THREADS) -> None:
+    """
+    Apply the configured torch thread counts (0 leaves torch's default).
+    """
+    import torch
+
+    if intra:
+        torch.set_num_threads(intra)
+    if inter:
+        try:
+            torch.set_num_interop_threads(inter)
+        except RuntimeError:
+            # Only settable once, before any inter-op parallel work has run
+            pass
+
+
+def is_quantized(model) -> bool:
+    """
+    Whether `model` holds dynamically quantized Linear layers.
+    """
+    from torch.ao.nn.quantized.dynamic import Linear
+
+    return any(isinstance(m, Linear) for m in model.modules())
+
+
+def _cache_path(model_id: str) -> str:
+    import torch
+    import transformers
+
+    name = model_id.strip("/").replace("/", "--")
+    return os.path.join(
+        QUANT_DIR,
+        f"{name}.int8.torch-{torch.__version__}.tf-{transformers.__version__}.pt"
+    )
+
+
+def load_quantized(model_id: str, load_fp32):
+    """
+    Int8 dynamically quantized copy of a model, for CPU inference.
+    nn.Linear weights are quantized once and the whole quantized module is
+    saved under QUANT_DIR; later loads read it back directly and never
+    materialise the fp32 weights. The file name carries the torch and
+    transformers versions since the module is pickled.
+    """
+    import torch
+    from torch.ao.quantization import quantize_dynamic
+
+    path = _cache_path(model_id)
+    if os.path.exists(path):
+        model = torch.load(path, weights_only=False)
+        model.eval()
+        return model
+
+    model = quantize_dynamic(load_fp32().cpu().eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+    os.makedirs(QUANT_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=QUANT_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        torch.save(model, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return model
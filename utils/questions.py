@@ -0,0 +1,170 @@
+# utils/questions.py
+import re
+
+from utils.config import QG_BATCH_SIZE, QG_MAX_QUESTIONS
+from utils.registry import private_tokenizer
+from utils.text import split_sentences
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "do",
+    "for", "from", "has", "have", "he", "her", "his", "how", "i", "if",
+    "in", "into", "is", "it", "its", "just", "like", "may", "more", "not",
+    "of", "on", "or", "our", "out", "she", "so", "some", "than", "that",
+    "the", "their", "them", "then", "there", "these", "they", "this",
+    "to", "up", "us", "very", "was", "we", "were", "what", "when", "which",
+    "who", "will", "with", "would", "you", "your", "okay", "yeah", "um",
+    "uh", "going", "get", "got", "know", "really", "right", "thing",
+    "things", "also", "all", "one", "about", "because", "been", "being",
+    "over", "many", "much", "most", "only", "such", "each", "other",
+}
+
+_WORD = re.compile(r"[A-Za-z0-9][\w'-]*")
+
+
+def _answer_span(sentence: str):
+    """
+    Pick the phrase a question should be about: a number, a run of
+    capitalised words inside the sentence, or else the longest run of
+    content words. Returns (start, end) character offsets or None.
+    """
+    words = list(_WORD.finditer(sentence))
+    if len(words) < 6:
+        return None
+
+    for m in words:
+        if any(ch.isdigit() for ch in m.group()):
+            return m.span()
+
+    best = None
+    run = []
+    for i, m in enumerate(words + [None]):
+        keep = (
+            m is not None
+            and i > 0
+            and m.group()[0].isupper()
+            and m.group().lower() not in STOPWORDS
+        )
+        if keep:
+            run.append(m)
+            continue
+        if run and (best is None or len(run) > len(best)):
+            best = run
+        run = []
+    if best:
+        return best[0].start(), best[-1].end()
+
+    run = []
+    for m in words + [None]:
+        if m is not None and m.group().lower() not in STOPWORDS and len(m.group()) > 2:
+            run.append(m)
+            continue
+        if run and (best is None or len(run) > len(best)):
+            best = run[:3]
+        run = []
+    if best:
+        return best[0].start(), best[-1].end()
+    return None
+
+
+def spread(items: list, n: int) -> list:
+    """
+    At most `n` items, evenly spaced over the list.
+    """
+    if len(items) <= n:
+        return items
+    step = len(items) / n
+    return [items[int(k * step)] for k in range(n)]
+
+
+def build_inputs(text: str, max_inputs: int) -> list:
+    """
+    Highlighted prompts for valhalla/t5-small-qg-hl, spread evenly over
+    the whole transcript. Each prompt has the answer span wrapped in <hl>
+    and one sentence of context on either side.
+    """
+    sentences = split_sentences(text)
+    candidates = []
+    for i, sentence in enumerate(sentences):
+        span = _answer_span(sentence)
+        if span:
+            candidates.append((i, span))
+
+    candidates = spread(candidates, max_inputs)
+
+    inputs = []
+    for i, (start, end) in candidates:
+        sentence = sentences[i]
+        highlighted = f"{sentence[:start]}<hl> {sentence[start:end]} <hl>{sentence[end:]}"
+        context = sentences[max(0, i - 1):i] + [highlighted] + sentences[i + 1:i + 2]
+        inputs.append("generate question: " + " ".join(context))
+    return inputs
+
+
+def _bag(question: str) -> set:
+    return {w.lower() for w in _WORD.findall(question)} - STOPWORDS
+
+
+def dedupe_questions(questions: list, threshold: float = 0.7) -> list:
+    """
+    Drop questions whose content words overlap an earlier question's by
+    at least `threshold` (Jaccard similarity).
+    """
+    kept, bags = [], []
+    for q in questions:
+        bag = _bag(q)
+        if not bag:
+            continue
+        if any(len(bag & b) / len(bag | b) >= threshold for b in bags):
+            continue
+        kept.append(q)
+        bags.append(bag)
+    return kept
+
+
+def run_prompts(inputs: list, qg, batch_size: int = QG_BATCH_SIZE, **params) -> list:
+    """
+    Run highlighted prompts through the QG pipeline and return the
+    questions in input order. Prompts are sorted by token length and
+    batched so each batch is padded only to its own longest prompt.
+    """
+    if not inputs:
+        return []
+
+    lengths = [len(ids) for ids in private_tokenizer(qg.tokenizer)(inputs)["input_ids"]]
+    order = sorted(range(len(inputs)), key=lengths.__getitem__)
+    params = {"max_length": 64, **params}
+
+    generated = [None] * len(inputs)
+    for i in range(0, len(order), batch_size):
+        bucket = order[i:i + batch_size]
+        out = qg(
+            [inputs[j] for j in bucket],
+            batch_size=len(bucket),
+            truncation=True,
+            **params
+        )
+        for j, o in zip(bucket, out):
+            generated[j] = o["generated_text"].strip()
+
+    questions = []
+    for q in generated:
+        q = q.split("?")[0].strip()
+        if q:
+            questions.append(q + "?")
+    return questions
+
+
+def generate_question_list(
+    text: str,
+    qg,
+    max_questions: int = QG_MAX_QUESTIONS,
+    batch_size: int = QG_BATCH_SIZE,
+    **params,
+) -> list:
+    """
+    Generate up to `max_questions` questions from the whole transcript.
+    """
+    # Oversample so there is still enough left after de-duplication
+    inputs = build_inputs(text, max_questions * 2)
+    questions = run_prompts(inputs, qg, batch_size, **params)
+    return dedupe_questions(questions)[:max_questions]
@@ -0,0 +1,190 @@
+# utils/registry.py
+import copy
+import gc
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from utils.config import MODEL_BUDGET_MB
+
+
+def model_nbytes(obj) -> int:
+    """
+    Bytes held by the weights and buffers of every torch module inside
+    `obj` (a model, a pipeline, or a tuple such as (processor, model)).
+    Read from the state dict so int8-packed Linear weights are counted,
+    and shared tensors (tied embeddings) only once.
+    """
+    if isinstance(obj, (tuple, list)):
+        return sum(model_nbytes(o) for o in obj)
+    module = getattr(obj, "model", obj)
+    if not hasattr(module, "state_dict"):
+        return 0
+
+    seen = set()
+    total = 0
+    stack = list(module.state_dict().values())
+    while stack:
+        value = stack.pop()
+        if isinstance(value, (tuple, list)):
+            stack.extend(value)
+            continue
+        if not hasattr(value, "element_size"):
+            continue
+        try:
+            ptr = value.data_ptr()
+        except RuntimeError:
+            ptr = id(value)
+        if ptr in seen:
+            continue
+        seen.add(ptr)
+        total += value.numel() * value.element_size()
+    return total
+
+
+def current_rss() -> int:
+    """
+    Resident set size of this process in bytes (Linux), or 0 if unknown.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return 0
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+_local = threading.local()
+
+
+def private_tokenizer(tokenizer):
+    """
+    This thread's own copy of a tokenizer that is shared through the pool.
+    A fast tokenizer's truncation and padding settings are mutable state,
+    and calling it with different settings from two threads at once fails
+    with "Already borrowed". Code that tokenizes only to count or chunk
+    text uses a copy, leaving the shared tokenizer to the pipeline calls,
+    which always pass the same settings. Copies are made once per thread
+    and do not keep an evicted model's tokenizer alive.
+    """
+    copies = _local.__dict__.setdefault("tokenizers", {})
+    entry = copies.get(id(tokenizer))
+    if entry is None or entry[0]() is not tokenizer:
+        entry = (weakref.ref(tokenizer), copy.deepcopy(tokenizer))
+        copies[id(tokenizer)] = entry
+    return entry[1]
+
+
+class ModelPool:
+    """
+    Registry of lazily loaded models.
+    Each model is built by its loader the first time a stage asks for it.
+    When the total size of loaded models goes over `budget_mb`, the least
+    recently used models that no stage is currently using are dropped;
+    they are loaded again on their next use. A budget of 0 never evicts.
+    """
+
+    def __init__(self, budget_mb: int = MODEL_BUDGET_MB):
+        self.budget = budget_mb * 1024 * 1024
+        self._loaders = {}
+        self._models = OrderedDict()
+        self._info = {}
+        self._in_use = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def register(self, name: str, loader) -> None:
+        self._loaders[name] = loader
+        self._load_locks[name] = threading.Lock()
+        self._in_use[name] = 0
+        self._info[name] = {"loads": 0, "size": 0, "rss": 0, "load_s": 0.0, "last_used": None}
+
+    @contextmanager
+    def use(self, name: str):
+        """
+        Hold a model for the duration of a stage; it cannot be evicted meanwhile.
+        """
+        model = self._acquire(name)
+        try:
+            yield model
+        finally:
+            with self._lock:
+                self._in_use[name] -= 1
+                self._info[name]["last_used"] = time.time()
+
+    def get(self, name: str):
+        with self.use(name) as model:
+            return model
+
+    def _acquire(self, name: str):
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                self._in_use[name] += 1
+                return self._models[name]
+
+        # Load outside the pool lock so other stages keep running;
+        # the per-model lock stops two sessions loading the same model.
+        with self._load_locks[name]:
+            with self._lock:
+                if name in self._models:
+                    self._models.move_to_end(name)
+                    self._in_use[name] += 1
+                    return self._models[name]
+
+            rss = current_rss()
+            start = time.perf_counter()
+            model = self._loaders[name]()
+            info = self._info[name]
+            info["load_s"] = time.perf_counter() - start
+            info["rss"] = max(0, current_rss() - rss)
+            info["size"] = model_nbytes(model)
+            info["loads"] += 1
+
+            with self._lock:
+                self._models[name] = model
+                self._in_use[name] += 1
+                self._evict_idle()
+            return model
+
+    def _evict_idle(self) -> None:
+        if not self.budget:
+            return
+        total = sum(self._info[n]["size"] for n in self._models)
+        for name in list(self._models):
+            if total <= self.budget:
+                break
+            if self._in_use[name]:
+                continue
+            del self._models[name]
+            total -= self._info[name]["size"]
+        gc.collect()
+
+    def evict(self, name: str) -> None:
+        with self._lock:
+            if name in self._models and not self._in_use[name]:
+                del self._models[name]
+        gc.collect()
+
+    def stats(self) -> list:
+        """
+        One row per registered model: whether it is loaded, its size,
+        RSS growth and time of its last load, and how often it was loaded.
+        """
+        with self._lock:
+            return [
+                {
+                    "name": name,
+                    "loaded": name in self._models,
+                    "in_use": self._in_use[name],
+                    "size_mb": info["size"] / 2**20,
+                    "rss_mb": info["rss"] / 2**20,
+                    "load_s": info["load_s"],
+                    "loads": info["loads"],
+                    "last_used": info["last_used"],
+                }
+                for name, info in self._info.items()
+            ]
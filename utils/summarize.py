@@ -0,0 +1,162 @@
+# utils/summarize.py
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+
+from utils.config import SUMMARY_BATCH_SIZE, SUMMARY_EXECUTOR, SUMMARY_WORKERS
+from utils.quantize import is_quantized
+from utils.registry import private_tokenizer
+from utils.text import split_sentences
+
+# Summarization pipeline owned by each worker process (executor="process")
+_worker_pipe = None
+_process_pools = {}
+
+
+def chunk_text(text: str, tokenizer, max_tokens: int) -> list:
+    """
+    Pack whole sentences into chunks of at most `max_tokens` tokens.
+    A sentence longer than the window (Whisper often drops punctuation)
+    is cut on token boundaries.
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+
+    encoded = tokenizer(sentences, add_special_tokens=False)["input_ids"]
+    chunks = []
+    current, size = [], 0
+
+    for sentence, ids in zip(sentences, encoded):
+        if len(ids) > max_tokens:
+            if current:
+                chunks.append(" ".join(current))
+                current, size = [], 0
+            for i in range(0, len(ids), max_tokens):
+                chunks.append(tokenizer.decode(ids[i:i + max_tokens]).strip())
+            continue
+
+        if current and size + len(ids) > max_tokens:
+            chunks.append(" ".join(current))
+            current, size = [], 0
+        current.append(sentence)
+        size += len(ids)
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _summarize_batch(summarizer, batch: list, params: dict) -> list:
+    out = summarizer(batch, batch_size=len(batch), truncation=True, **params)
+    return [o["summary_text"].strip() for o in out]
+
+
+def _init_worker(model_name: str, fast_cpu: bool, threads: int) -> None:
+    global _worker_pipe
+    import torch
+
+    from utils.models import load_pipeline
+
+    # same precision as the caller's model, so results match its cache key
+    _worker_pipe = load_pipeline("summarization", model_name, fast_cpu, daemon="")
+    torch.set_num_threads(threads)
+
+
+def _worker_batch(batch: list, params: dict) -> list:
+    return _summarize_batch(_worker_pipe, batch, params)
+
+
+def _process_pool(model_name: str, fast_cpu: bool, workers: int) -> ProcessPoolExecutor:
+    # Worker processes load their own copy of the model, so keep them
+    # alive across calls instead of paying the load every time.
+    key = (model_name, fast_cpu, workers)
+    if key not in _process_pools:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        _process_pools[key] = ProcessPoolExecutor(
+            workers,
+            initializer=_init_worker,
+            initargs=(model_name, fast_cpu, threads)
+        )
+    return _process_pools[key]
+
+
+def summarize_chunks(
+    chunks: list,
+    summarizer,
+    params: dict,
+    batch_size: int = SUMMARY_BATCH_SIZE,
+    workers: int = SUMMARY_WORKERS,
+    executor: str = SUMMARY_EXECUTOR,
+) -> list:
+    """
+    Map stage: summarize every chunk, `batch_size` chunks per pipeline call,
+    spreading the batches over a thread or process pool. A daemon-backed
+    summarizer always uses threads, whose calls the daemon batches together.
+    """
+    batches = [chunks[i:i + batch_size] for i in range(0, len(chunks), batch_size)]
+
+    if workers <= 1 or len(batches) <= 1:
+        results = [_summarize_batch(summarizer, b, params) for b in batches]
+    elif executor == "process" and not getattr(summarizer, "remote", False):
+        pool = _process_pool(
+            summarizer.model.name_or_path, is_quantized(summarizer.model), workers
+        )
+        results = list(pool.map(_worker_batch, batches, repeat(params)))
+    else:
+        with ThreadPoolExecutor(workers) as pool:
+            results = list(pool.map(
+                lambda b: _summarize_batch(summarizer, b, params), batches
+            ))
+
+    return [summary for batch in results for summary in batch]
+
+
+def context_window(summarizer) -> int:
+    """
+    Number of input tokens one summarizer call can see, minus <s> and </s>.
+    """
+    limit = summarizer.tokenizer.model_max_length
+    positions = getattr(summarizer.model.config, "max_position_embeddings", None)
+    if positions:
+        limit = min(limit, positions)
+    return limit - 2
+
+
+def summarize_long(
+    text: str,
+    summarizer,
+    max_length: int = 200,
+    min_length: int = 70,
+    batch_size: int = SUMMARY_BATCH_SIZE,
+    workers: int = SUMMARY_WORKERS,
+    executor: str = SUMMARY_EXECUTOR,
+    **params,
+) -> str:
+    """
+    Map-reduce summary of an arbitrarily long transcript.
+    The text is split into chunks that fit the model's context, each chunk
+    is summarized, and the joined summaries are summarized again until
+    everything fits in a single window.
+    """
+    params = {"max_length": max_length, "min_length": min_length, **params}
+    window = context_window(summarizer)
+    tokenizer = private_tokenizer(summarizer.tokenizer)
+    chunks = chunk_text(text, tokenizer, window)
+    if not chunks:
+        return ""
+
+    while len(chunks) > 1:
+        summaries = summarize_chunks(
+            chunks, summarizer, params,
+            batch_size=batch_size, workers=workers, executor=executor
+        )
+        merged = chunk_text(" ".join(summaries), tokenizer, window)
+        if not merged:
+            return ""
+        if len(merged) >= len(chunks):
+            # Summaries are not getting shorter; keep what fits one window
+            merged = merged[:1]
+        chunks = merged
+
+    return _summarize_batch(summarizer, chunks, params)[0]
@@ -0,0 +1,181 @@
+# utils/text.py
+import re
+
+import numpy as np
+
+_SPLIT = re.compile(r"(\w+)")
+# Sentence boundary as clean_text sees it once non-ASCII runs become spaces
+_BOUNDARY = re.compile(r'(?<=[.!?])(?:\s|[^\x00-\x7F])+')
+
+# (min words, max words, separator) for each repetition pass, longest
+# phrases first, mirroring the regex cascade clean_text used to run:
+#   \b((?:\w+\s+){5,15}\w+)(?:\s+\1)+  ...  \b(\w+)( \1\b)+
+_PASSES = [
+    (6, 16, None),
+    (4, 9, None),
+    (2, 4, None),
+    (1, 1, " "),
+]
+
+
+def split_sentences(text: str) -> list:
+    return [s.strip() for s in re.split(r'(?<=[.!?])\s+', text) if s.strip()]
+
+
+def _ids(items, key=None):
+    table = {}
+    return np.fromiter(
+        (table.setdefault(key(x) if key else x, len(table)) for x in items),
+        dtype=np.int64,
+        count=len(items)
+    ), table
+
+
+def collapse_repeats(text: str, min_words: int, max_words: int, sep: str = None) -> str:
+    """
+    Collapse a phrase of `min_words`..`max_words` words that is immediately
+    repeated one or more times into a single copy (case-insensitive).
+    Phrases only span whitespace, the longest repeated phrase at a position
+    wins, and scanning resumes after the collapsed run, like re.sub did.
+    `sep` restricts the gap between copies to that exact string;
+    by default any whitespace is accepted.
+
+    Words and gaps are mapped to integer ids. For each phrase length k,
+    prefix sums over "token x equals token x+k" give every position where
+    a k-word phrase repeats in O(n), so the whole pass is O(n * max_words)
+    with no backtracking. Only actual repeats are visited in Python.
+    """
+    # parts = [lead, w0, g0, w1, g1, ..., w(n-1), tail]
+    parts = _SPLIT.split(text)
+    words, gaps = parts[1::2], parts[2:-1:2]
+    n = len(words)
+    if n < 2 * min_words:
+        return text
+
+    w, _ = _ids(words, str.lower)
+    g, gap_ids = _ids(gaps)
+    space = np.fromiter((x.isspace() for x in gaps), dtype=bool, count=n - 1)
+    sep_ok = space if sep is None else g == gap_ids.get(sep, -1)
+    # broken[x] = number of non-whitespace gaps before word x
+    broken = np.concatenate(([0], np.cumsum(~space)))
+
+    repeats = {}
+    for k in range(min_words, max_words + 1):
+        m = n - 2 * k + 1  # start positions with room for one repeat
+        if m <= 0:
+            break
+        diff_w = np.concatenate(([0], np.cumsum(w[:-k] != w[k:])))
+        ok = diff_w[k:k + m] == diff_w[:m]
+        if k > 1:
+            diff_g = np.concatenate(([0], np.cumsum(g[:-k] != g[k:])))
+            ok &= diff_g[k - 1:k - 1 + m] == diff_g[:m]
+            ok &= broken[k - 1:k - 1 + m] == broken[:m]
+        ok &= sep_ok[k - 1:k - 1 + m]
+        repeats[k] = ok
+
+    if not repeats:
+        return text
+
+    starts = np.zeros(n, dtype=bool)
+    for ok in repeats.values():
+        starts[:ok.size] |= ok
+
+    out = []
+    last = 0
+    resume = 0
+    for i in np.flatnonzero(starts).tolist():
+        if i < resume:
+            continue
+        k = max(k for k, ok in repeats.items() if i < ok.size and ok[i])
+        ok = repeats[k]
+        j = i + 2 * k
+        while j - k < ok.size and ok[j - k]:
+            j += k
+
+        # keep copy one, drop the gap after it and every following copy
+        out.append("".join(parts[last:2 * (i + k)]))
+        last = 2 * j
+        resume = j
+
+    out.append("".join(parts[last:]))
+    return "".join(out)
+
+
+def clean_text(text: str) -> str:
+    """
+    Normalise a raw Whisper transcript: collapse whitespace, drop non-ASCII,
+    remove repeated sentences and stuttered words or phrases.
+    Runs in linear time in the length of the transcript.
+    """
+    text = re.sub(r"\s+", " ", text).strip()
+    text = re.sub(r"[^\x00-\x7F]+", " ", text)
+    sentences = re.split(r'(?<=[.!?])\s+', text)
+    cleaned = []
+    seen = set()
+
+    for s in sentences:
+        s_strip = s.strip()
+        if len(s_strip) < 5:
+            continue
+        s_key = s_strip.lower()
+        if s_key in seen:
+            continue
+
+        seen.add(s_key)
+        cleaned.append(s_strip)
+
+    text = " ".join(cleaned)
+
+    for min_words, max_words, sep in _PASSES:
+        text = collapse_repeats(text, min_words, max_words, sep)
+
+    return text.strip()
+
+
+class StreamCleaner:
+    """
+    clean_text for a transcript that arrives piece by piece.
+    feed() returns the sentences completed so far, cleaned; the trailing
+    unfinished sentence is held back until more text or flush() arrives.
+    Repeats never span a sentence boundary, so the emitted sentences
+    joined with spaces match clean_text on the whole transcript.
+    """
+
+    def __init__(self):
+        self._tail = ""
+        self._seen = set()
+
+    def feed(self, text: str) -> list:
+        # The tail is kept before non-ASCII replacement so re-normalising
+        # it with the next piece cannot merge the spaces that produces
+        text = re.sub(r"\s+", " ", f"{self._tail} {text}").strip()
+        sentences = _BOUNDARY.split(text)
+        self._tail = sentences.pop()
+        return self._clean(sentences)
+
+    def flush(self) -> list:
+        tail, self._tail = self._tail, ""
+        return self._clean([tail])
+
+    def _clean(self, sentences: list) -> list:
+        cleaned = []
+        for s in sentences:
+            s_strip = re.sub(r"[^\x00-\x7F]+", " ", s).strip()
+            if len(s_strip) < 5:
+                continue
+            s_key = s_strip.lower()
+            if s_key in self._seen:
+                continue
+
+            self._seen.add(s_key)
+            cleaned.append(s_strip)
+
+        if not cleaned:
+            return []
+
+        # One pass over the whole batch is cheaper than one per sentence;
+        # the sentence separators keep repeats from crossing sentences.
+        text = "\n".join(cleaned)
+        for min_words, max_words, sep in _PASSES:
+            text = collapse_repeats(text, min_words, max_words, sep)
+        return [s.strip() for s in text.split("\n") if s.strip()]
@@ -0,0 +1,145 @@
+# utils/vad.py
+from typing import NamedTuple
+
+import numpy as np
+
+from utils.audio import TARGET_SR
+
+FRAME = 512          # 32 ms analysis frame at 16 kHz
+HOP = 160            # 10 ms between frames
+BLOCK_FRAMES = 6000  # frames analysed per librosa call (one minute)
+
+
+class Segment(NamedTuple):
+    start: float
+    end: float
+
+
+def frame_features(samples: np.ndarray):
+    """
+    Per-frame RMS energy (dBFS) and spectral flatness of 16 kHz mono audio.
+    Computed a minute at a time so the STFT of a long lecture is never
+    held in memory at once.
+    """
+    import librosa
+
+    n_frames = max(0, 1 + (samples.size - FRAME) // HOP)
+    energy = np.empty(n_frames, dtype=np.float32)
+    flatness = np.empty(n_frames, dtype=np.float32)
+
+    for first in range(0, n_frames, BLOCK_FRAMES):
+        count = min(BLOCK_FRAMES, n_frames - first)
+        y = np.ascontiguousarray(samples[first * HOP:first * HOP + (count - 1) * HOP + FRAME])
+
+        rms = librosa.feature.rms(y=y, frame_length=FRAME, hop_length=HOP, center=False)[0]
+        S = np.abs(librosa.stft(y, n_fft=FRAME, hop_length=HOP, center=False)) ** 2
+        flat = librosa.feature.spectral_flatness(S=S, power=1.0)[0]
+
+        energy[first:first + count] = 20 * np.log10(np.maximum(rms[:count], 1e-10))
+        flatness[first:first + count] = flat[:count]
+
+    return energy, flatness
+
+
+def _runs(mask: np.ndarray):
+    """
+    (start, end) frame index pairs of the True runs in `mask`.
+    """
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def detect_speech(
+    samples: np.ndarray,
+    sr: int = TARGET_SR,
+    margin_db: float = 12.0,
+    floor_db: float = -55.0,
+    max_flatness: float = 0.5,
+    min_speech_s: float = 0.25,
+    min_silence_s: float = 0.6,
+    pad_s: float = 0.3,
+    max_gap_s: float = 3.0,
+    max_segment_s: float = 30.0,
+) -> list:
+    """
+    Speech segments of 16 kHz mono audio, in seconds from the start.
+
+    A frame counts as speech when its energy is `margin_db` above the
+    recording's noise floor (10th percentile, never below `floor_db`)
+    and its spectrum is tonal rather than noise-like (flatness below
+    `max_flatness`). Pauses shorter than `min_silence_s` are bridged,
+    blips shorter than `min_speech_s` dropped, segments padded by
+    `pad_s`, and the result covered with as few segments of at most
+    `max_segment_s` as possible. Whisper pads every input to 30 s, so
+    pauses up to `max_gap_s` stay inside a segment; longer silences
+    fall between segments and are skipped.
+    """
+    if sr != TARGET_SR:
+        raise ValueError(f"detect_speech expects {TARGET_SR} Hz audio, got {sr}")
+
+    energy, flatness = frame_features(samples)
+    if not energy.size:
+        return []
+
+    fps = sr / HOP
+    threshold = max(np.percentile(energy, 10), floor_db) + margin_db
+    speech = (energy > threshold) & (flatness < max_flatness)
+
+    # bridge short pauses, then drop short blips
+    starts, ends = _runs(~speech)
+    for s, e in zip(starts, ends):
+        if s > 0 and e < speech.size and e - s < min_silence_s * fps:
+            speech[s:e] = True
+    starts, ends = _runs(speech)
+    keep = ends - starts >= min_speech_s * fps
+    starts, ends = starts[keep], ends[keep]
+
+    # pad each run; the union of the padded runs is what gets transcribed
+    pad = int(pad_s * fps)
+    voiced = np.zeros(energy.size, dtype=bool)
+    for s, e in zip(np.maximum(starts - pad, 0), np.minimum(ends + pad, energy.size)):
+        voiced[s:e] = True
+    frames = np.flatnonzero(voiced)
+
+    # cover the voiced frames with as few windows of at most `max_segment_s`
+    # as possible. A window stops at the first pause longer than
+    # `max_gap_s`; otherwise it is cut inside the last pause before the
+    # limit, or failing that at the quietest frame of the last few seconds
+    limit = int(max_segment_s * fps)
+    search = int(min(5.0, max_segment_s / 3) * fps)
+    max_gap = int(max_gap_s * fps)
+    duration = samples.size / sr
+    segments = []
+    i = 0
+    while i < frames.size:
+        s = frames[i]
+        j = np.searchsorted(frames, s + limit)
+        steps = np.diff(frames[i:j])
+        long_gaps = np.flatnonzero(steps > max_gap)
+
+        if long_gaps.size:
+            cut = frames[i + long_gaps[0]] + 1
+        elif j == frames.size or frames[j] > s + limit:
+            cut = frames[j - 1] + 1
+        else:
+            lo = s + limit - search
+            gaps = np.flatnonzero(~voiced[lo:s + limit])
+            if gaps.size:
+                cut = lo + gaps[-1]
+            else:
+                cut = lo + int(np.argmin(energy[lo:s + limit]))
+
+        end = duration if cut >= energy.size else cut / fps
+        segments.append(Segment(float(s / fps), float(end)))
+        i = np.searchsorted(frames, cut)
+
+    return segments
+
+
+def speech_fraction(segments: list, duration: float) -> float:
+    """
+    Share of `duration` seconds covered by `segments`.
+    """
+    if duration <= 0:
+        return 0.0
+    return min(sum(s.end - s.start for s in segments) / duration, 1.0)